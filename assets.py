@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+# Bundles served by templates/layouts/main.html, as paths under static/, in
+# the order the browser has to evaluate them.
+BUNDLES = {
+    'css/fyyur.css': [
+        'css/bootstrap.min.css',
+        'css/layout.main.css',
+        'css/main.css',
+        'css/main.responsive.css',
+        'css/main.quickfix.css',
+    ],
+    'js/head.js': [
+        'js/libs/modernizr-2.8.2.min.js',
+        'js/libs/moment.min.js',
+    ],
+    'js/deferred.js': [
+        'js/script.js',
+        'js/libs/bootstrap-3.1.1.min.js',
+        'js/plugins.js',
+    ],
+}
+
+# static/dist sits next to static/css, so relative url(../fonts/...) references
+# inside the bundled stylesheets keep resolving.
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+assets_cli = AppGroup('assets', help='Build the fingerprinted static bundles.')
+
+
+def minify_css(source):
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    return re.sub(r'\s*([{};,>])\s*', r'\1', source).strip()
+
+
+def minify_js(source):
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    # without rjsmin only whitespace-only lines are dropped; the libraries
+    # are shipped pre-minified already
+    return '\n'.join(line for line in source.splitlines() if line.strip())
+
+
+def build(static_folder):
+    '''Bundle, minify and fingerprint BUNDLES into static/dist.
+
+    Every bundle is written as <name>.<hash>.<ext> together with .gz and,
+    when the brotli module is installed, .br variants. Returns the manifest
+    mapping bundle names to their fingerprinted paths under static/.
+    '''
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                content = f.read()
+            parts.append(minify_css(content) if name.endswith('.css') else minify_js(content))
+        separator = '\n' if name.endswith('.css') else ';\n'
+        body = separator.join(parts).encode('utf-8')
+
+        stem, ext = os.path.splitext(os.path.basename(name))
+        filename = '%s.%s%s' % (stem, hashlib.sha256(body).hexdigest()[:12], ext)
+        path = os.path.join(dist, filename)
+        with open(path, 'wb') as f:
+            f.write(body)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(body, quality=11))
+
+        manifest[name] = '%s/%s' % (DIST_DIR, filename)
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def init_app(app):
+    manifest = load_manifest(app.static_folder)
+    dist = os.path.join(app.static_folder, DIST_DIR)
+
+    @app.template_global()
+    def asset_urls(name):
+        # the fingerprinted bundle once `flask assets build` has run,
+        # otherwise its individual source files
+        if name in manifest:
+            return [url_for('static', filename=manifest[name])]
+        return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+    @app.route('/static/%s/<path:filename>' % DIST_DIR)
+    def dist_file(filename):
+        mimetype = mimetypes.guess_type(filename)[0]
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if encoding in request.accept_encodings and os.path.isfile(os.path.join(dist, filename + suffix)):
+                response = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(dist, filename, mimetype=mimetype)
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    app.cli.add_command(assets_cli)
+
+
+@assets_cli.command('build')
+def build_command():
+    '''Bundle, minify and fingerprint the CSS and JS.'''
+    for name, path in sorted(build(current_app.static_folder).items()):
+        click.echo('%s -> %s' % (name, path))
@@ -0,0 +1,195 @@
+import bisect
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Venue, Artist
+
+
+def _normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def _keys(name):
+    # the whole name and its tail from every later word, so 'hop' finds
+    # 'The Musical Hop'
+    name = _normalize(name)
+    return {name[i:] for i in [0] + [i + 1 for i, char in enumerate(name) if char == ' ']}
+
+
+class PrefixIndex(object):
+    '''Names of one table, matched by prefix in memory.
+
+    The keys are a single sorted list of (key, id) pairs, so a lookup is a
+    bisect to the first key starting with the prefix and a short scan, and
+    an update is an insort/delete per word of the name.
+    '''
+
+    def __init__(self, rows=()):
+        self._lock = threading.Lock()
+        self._names = {}  # id -> name
+        self._keys = []   # sorted (key, id)
+        for id, name in rows:
+            if name:
+                self._names[id] = name
+                self._keys.extend((key, id) for key in _keys(name))
+        self._keys.sort()
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, id, name):
+        '''Index `name` under `id`, replacing the name it had.'''
+        with self._lock:
+            self._remove(id)
+            if name:
+                self._names[id] = name
+                for key in _keys(name):
+                    bisect.insort(self._keys, (key, id))
+
+    def remove(self, id):
+        with self._lock:
+            self._remove(id)
+
+    def search(self, prefix, limit):
+        '''Up to `limit` (id, name) pairs whose name or one of its words starts with `prefix`.'''
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        matches = []
+        seen = set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(matches) < limit:
+                key, id = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                if id not in seen:
+                    seen.add(id)
+                    matches.append((id, self._names[id]))
+                i += 1
+        return matches
+
+    def _remove(self, id):
+        name = self._names.pop(id, None)
+        if name is None:
+            return
+        for key in _keys(name):
+            i = bisect.bisect_left(self._keys, (key, id))
+            if i < len(self._keys) and self._keys[i] == (key, id):
+                del self._keys[i]
+
+
+# the tables with a name index
+INDEXED = (Venue, Artist)
+
+
+class Autocomplete(object):
+    '''The venue and artist name indexes of one application.
+
+    The indexes are built by the first lookup of each process, or before the
+    workers fork by app.preload(), so commands and migrations never read
+    the tables. After that a background thread in each worker process
+    rebuilds them every `refresh` seconds and swaps the new ones in, so
+    requests only ever read them. The handlers of a process keep its
+    indexes current between rebuilds; writes made through other workers
+    show up with the next rebuild.
+    '''
+
+    def __init__(self, app, refresh=300):
+        self.app = app
+        self.refresh = refresh
+        self.built = False
+        self._indexes = {model.__tablename__: PrefixIndex() for model in INDEXED}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # updates made while a rebuild reads the tables, replayed onto its indexes
+        self._pending = None
+        # the process running the refresher, threads do not survive a fork
+        self._refresher_pid = None
+
+    def build(self):
+        '''Build the indexes unless they are built, logging a failure.'''
+        with self._build_lock:
+            if self.built:
+                return
+            try:
+                self.rebuild()
+            except Exception:
+                # e.g. no tables yet; the next lookup tries again
+                self.app.logger.exception('building the autocomplete indexes failed')
+
+    def rebuild(self):
+        '''Read the names of every indexed table and swap in new indexes.'''
+        with self._lock:
+            self._pending = []
+        try:
+            indexes = {name: PrefixIndex(rows) for name, rows in self._read().items()}
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for name, method, args in self._pending:
+                getattr(indexes[name], method)(*args)
+            self._pending = None
+            self._indexes = indexes
+            self.built = True
+
+    def search(self, model, prefix, limit):
+        if not self.built:
+            self.build()
+        self._start_refresher()
+        return self._indexes[model.__tablename__].search(prefix, limit)
+
+    def add(self, model, id, name):
+        self._update(model, 'add', (id, name))
+
+    def remove(self, model, id):
+        self._update(model, 'remove', (id,))
+
+    def _read(self):
+        # {table: [(id, name)]}, always from the primary whatever the request
+        # routing picked: a lagging replica could miss names this process
+        # already added to the indexes being replaced
+        with self.app.app_context():
+            with db.get_engine(self.app).connect() as connection:
+                return {model.__tablename__: connection.execute(select([model.id, model.name])).fetchall()
+                        for model in INDEXED}
+
+    def _update(self, model, method, args):
+        with self._lock:
+            getattr(self._indexes[model.__tablename__], method)(*args)
+            if self._pending is not None:
+                self._pending.append((model.__tablename__, method, args))
+
+    def _start_refresher(self):
+        # started by the first lookup of each process, so neither a preloading
+        # master nor a CLI command runs one
+        if not self.refresh or self._refresher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._refresher_pid == os.getpid():
+                return
+            self._refresher_pid = os.getpid()
+        threading.Thread(target=self._refresh_forever, name='autocomplete-refresh', daemon=True).start()
+
+    def _refresh_forever(self):
+        while True:
+            time.sleep(self.refresh)
+            try:
+                self.rebuild()
+            except Exception:
+                self.app.logger.exception('rebuilding the autocomplete indexes failed')
+
+
+def init_app(app):
+    app.extensions['autocomplete'] = Autocomplete(app, app.config.get('AUTOCOMPLETE_REFRESH', 300))
+
+
+def current_autocomplete():
+    '''The name indexes of the current application.'''
+    return current_app.extensions['autocomplete']
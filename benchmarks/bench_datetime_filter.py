@@ -0,0 +1,54 @@
+"""Compare the datetime Jinja filter with the original implementation.
+
+    python -m benchmarks.bench_datetime_filter --tiles 5000 --distinct 500
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import babel.dates
+import dateutil.parser
+
+from filters import format_datetime
+
+
+def original_format_datetime(value, format='medium'):
+    # the filter as it was before start_time became a timestamp
+    date = dateutil.parser.parse(value) if isinstance(value, str) else value
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tiles', type=int, default=5000,
+                        help='show tiles rendered per simulated page')
+    parser.add_argument('--distinct', type=int, default=500,
+                        help='distinct start times among those tiles')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    epoch = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    start_times = [epoch + timedelta(hours=rng.randint(0, 24 * 365)) for _ in range(args.distinct)]
+    tiles = [rng.choice(start_times) for _ in range(args.tiles)]
+
+    for start_time in tiles[:args.distinct]:
+        assert format_datetime(start_time, 'full') == original_format_datetime(start_time, 'full')
+
+    def page(filter):
+        return lambda: [filter(start_time, 'full') for start_time in tiles]
+
+    for name, run in [('original', page(original_format_datetime)),
+                      ('cold', lambda: (format_datetime.cache_clear(), page(format_datetime)())),
+                      ('warm', page(format_datetime))]:
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print('%-9s %8.2f ms/page  %6.2f us/tile' % (name, best * 1000, best * 1e6 / args.tiles))
+
+
+if __name__ == '__main__':
+    main()
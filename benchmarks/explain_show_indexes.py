@@ -0,0 +1,68 @@
+"""Check that the venue and artist pages use the composite Show indexes.
+
+Seeds a database with a large number of shows, then asks the planner how it
+would run the show lookups behind show_venue() and show_artist().
+
+    python -m benchmarks.explain_show_indexes --database-url sqlite:////tmp/fyyur_explain.db
+"""
+import argparse
+import sys
+
+from app import create_app
+from models import db, Show
+from queries import venue_shows_query, artist_shows_query
+from benchmarks.seed import seed
+
+
+VENUE_INDEX = 'ix_Show_venue_id_start_time'
+ARTIST_INDEX = 'ix_Show_artist_id_start_time'
+
+
+def explain(connection, query):
+    compiled = query.statement.compile(dialect=connection.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.dialect.name == 'sqlite' else 'EXPLAIN '
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(prefix + str(compiled), params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default='sqlite:////tmp/fyyur_explain.db')
+    parser.add_argument('--venues', type=int, default=1000)
+    parser.add_argument('--artists', type=int, default=5000)
+    parser.add_argument('--shows', type=int, default=1000000)
+    args = parser.parse_args(argv)
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_url})
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            if not connection.execute(db.select([db.func.count(Show.id)])).scalar():
+                seed(connection, args.venues, args.artists, args.shows)
+
+        checks = [
+            (VENUE_INDEX, venue_shows_query(1)),
+            (ARTIST_INDEX, artist_shows_query(1)),
+        ]
+
+        failed = False
+        with db.engine.connect() as connection:
+            for index_name, query in checks:
+                plan = explain(connection, query)
+                used = index_name in plan
+                failed = failed or not used
+                print('%s %s\n%s\n' % ('OK  ' if used else 'FAIL', index_name, plan))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Latency benchmark of every route of the application.
+
+Seeds a database with the deterministic catalog from benchmarks.seed, drives
+each route through the Flask test client and reports p50/p95/p99 latency,
+SQL statements and rows fetched per request. Results are written as JSON;
+pass a previous result as --baseline to flag regressions.
+
+    python -m benchmarks.run --venues 500 --artists 2000 --shows 100000 --output bench.json
+    python -m benchmarks.run --no-reseed --baseline bench.json
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app import create_app
+from models import db, Venue, Show
+from benchmarks.seed import reset, today
+
+
+class Counters(object):
+    statements = 0
+    rows = 0
+
+    @classmethod
+    def reset(cls):
+        cls.statements = 0
+        cls.rows = 0
+
+
+class CountingCursor(sqlite3.Cursor):
+    # sqlite3 reports no rowcount for SELECTs, so count rows as they are fetched
+
+    def fetchone(self):
+        row = super(CountingCursor, self).fetchone()
+        if row is not None:
+            Counters.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super(CountingCursor, self).fetchmany(*args, **kwargs)
+        Counters.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super(CountingCursor, self).fetchall()
+        Counters.rows += len(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+
+    def cursor(self, factory=CountingCursor):
+        return super(CountingConnection, self).cursor(factory)
+
+
+def install_counters(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        Counters.statements += 1
+
+    if engine.dialect.name != 'sqlite':
+        @event.listens_for(engine, 'after_cursor_execute')
+        def count_rows(conn, cursor, statement, parameters, context, executemany):
+            # client-side cursors (psycopg2) know the result size up front
+            if cursor.description is not None and cursor.rowcount >= 0:
+                Counters.rows += cursor.rowcount
+
+
+def sample_ids():
+    # a venue and an artist with shows on both sides of now, and one show
+    show = Show.query.order_by(Show.id).first()
+    return {
+        'venue_id': show.venue_id,
+        'artist_id': show.artist_id,
+        'show_id': show.id,
+        'name': 'Jazz',
+        'format': 'csv',
+    }
+
+
+def venue_form(n):
+    return {
+        'name': 'Bench Venue %d' % n, 'city': 'Austin', 'state': 'TX',
+        'address': '%d Bench St' % n, 'phone': '555-0100',
+        'image_link': 'https://images.example.com/bench/venue%d.jpg' % n,
+        'facebook_link': 'https://www.facebook.com/benchvenue%d' % n,
+        'genres': ['Jazz', 'Blues'],
+    }
+
+
+def artist_form(n):
+    return {
+        'name': 'Bench Artist %d' % n, 'city': 'Austin', 'state': 'TX', 'phone': '555-0100',
+        'image_link': 'https://images.example.com/bench/artist%d.jpg' % n,
+        'facebook_link': 'https://www.facebook.com/benchartist%d' % n,
+        'genres': ['Rock n Roll'],
+    }
+
+
+def scratch_venue(n):
+    # a venue without shows, so delete_venue has something it may delete
+    with db.engine.begin() as connection:
+        result = connection.execute(Venue.__table__.insert(), {'name': 'Scratch Venue %d' % n})
+        return result.inserted_primary_key[0]
+
+
+def plan(app, ids, include_writes):
+    '''(label, endpoint, method, url values, form data factory) for each route.'''
+    forms = {
+        'venues.search_venues': lambda n: {'search_term': 'Hop'},
+        'artists.search_artists': lambda n: {'search_term': 'Band'},
+    }
+    if include_writes:
+        forms.update({
+            'venues.create_venue_submission': venue_form,
+            'venues.edit_venue_submission': venue_form,
+            'artists.create_artist_submission': artist_form,
+            'artists.edit_artist_submission': artist_form,
+            # past the seeded year and a new slot each time, so no request
+            # runs into a double booking
+            'shows.create_show_submission': lambda n: {
+                'venue_id': ids['venue_id'], 'artist_id': ids['artist_id'],
+                'start_time': (today() + timedelta(days=400, hours=3 * n)).isoformat(),
+            },
+        })
+
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if rule.endpoint in ('static', 'dist_file'):
+            continue
+        values = {arg: ids[arg] for arg in rule.arguments if arg in ids}
+        if len(values) != len(rule.arguments):
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if method == 'GET':
+                yield '%s %s' % (method, rule.rule), rule.endpoint, method, values, None
+            elif method == 'DELETE' and include_writes and rule.endpoint == 'venues.delete_venue':
+                yield '%s %s' % (method, rule.rule), rule.endpoint, method, values, 'scratch'
+            elif rule.endpoint in forms:
+                yield '%s %s' % (method, rule.rule), rule.endpoint, method, values, forms[rule.endpoint]
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100, method='inclusive')[p - 1] if len(samples) > 1 else samples[0]
+
+
+def measure(app, client, endpoint, method, values, form, requests, warmup, cached):
+    from flask import url_for
+
+    latencies, statements, rows, statuses = [], [], [], set()
+    for n in range(warmup + requests):
+        url_values = dict(values)
+        if form == 'scratch':
+            url_values['venue_id'] = scratch_venue(n)
+        with app.test_request_context():
+            url = url_for(endpoint, **url_values)
+        data = form(n) if callable(form) else None
+        if not cached:
+            app.extensions['page_cache'].clear()
+
+        Counters.reset()
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+
+        if n >= warmup:
+            latencies.append(elapsed * 1000)
+            statements.append(Counters.statements)
+            rows.append(Counters.rows)
+            statuses.add(response.status_code)
+
+    return {
+        'requests': requests,
+        'status': sorted(statuses),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'statements': round(statistics.mean(statements), 2),
+        'rows': round(statistics.mean(rows), 2),
+    }
+
+
+def compare(results, baseline, threshold):
+    # routes whose p95 grew by more than `threshold` or that issue more SQL
+    regressions = []
+    for label, current in results['routes'].items():
+        previous = baseline['routes'].get(label)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * threshold:
+            regressions.append('%s: p95 %.2fms -> %.2fms' % (label, previous['p95_ms'], current['p95_ms']))
+        if current['statements'] > previous['statements']:
+            regressions.append('%s: statements %s -> %s' % (label, previous['statements'], current['statements']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default='sqlite:////tmp/fyyur_bench.db')
+    parser.add_argument('--venues', type=int, default=500)
+    parser.add_argument('--artists', type=int, default=2000)
+    parser.add_argument('--shows', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-reseed', action='store_true', help='reuse the data already in the database')
+    parser.add_argument('--requests', type=int, default=50, help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cached', action='store_true', help='keep the page cache between requests')
+    parser.add_argument('--include-writes', action='store_true', help='also drive the create/edit/delete routes')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='previous results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='allowed p95 growth factor')
+    args = parser.parse_args(argv)
+
+    config = {'SQLALCHEMY_DATABASE_URI': args.database_url}
+    if args.database_url.startswith('sqlite'):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'factory': CountingConnection}}
+    app = create_app(config)
+
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'database': args.database_url.split(':')[0],
+        'venues': args.venues, 'artists': args.artists, 'shows': args.shows, 'seed': args.seed,
+        'cached': args.cached,
+        'routes': {},
+    }
+
+    with app.app_context():
+        if not args.no_reseed:
+            reset(args.venues, args.artists, args.shows, args.seed)
+        install_counters(db.engine)
+        ids = sample_ids()
+        db.session.remove()
+
+        client = app.test_client()
+        for label, endpoint, method, values, form in plan(app, ids, args.include_writes):
+            stats = measure(app, client, endpoint, method, values, form, args.requests, args.warmup, args.cached)
+            results['routes'][label] = stats
+            print('%-40s p50 %8.2fms  p95 %8.2fms  p99 %8.2fms  %6.1f stmts  %9.1f rows  %s' % (
+                label, stats['p50_ms'], stats['p95_ms'], stats['p99_ms'],
+                stats['statements'], stats['rows'], stats['status']))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print('results written to %s' % args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Deterministic synthetic catalog for the benchmarks.
+
+The same counts, seed and anchor always produce the same rows. Shows are
+spread a year either side of the anchor so pages have both past and
+upcoming shows.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from models import db, Venue, Artist, Show, Genre, venue_genres, artist_genres
+from forms import VenueForm
+
+GENRES = [value for value, _ in VenueForm.genres.kwargs['choices']]
+STATES = ['CA', 'NY', 'TX', 'WA', 'IL', 'FL', 'MA', 'OR']
+CITIES = ['San Francisco', 'New York', 'Austin', 'Seattle', 'Chicago', 'Miami', 'Boston', 'Portland']
+WORDS = ['Musical', 'Hop', 'Park', 'Square', 'Live', 'Coffee', 'Dueling', 'Pianos',
+         'Wild', 'Sax', 'Band', 'Guns', 'Petals', 'Blue', 'Note', 'Hall', 'Room', 'Club']
+
+SHOW_ATTEMPTS = 100
+
+# the materialized show counters, against the rollover watermark
+COUNT_SHOWS = '''
+UPDATE "{owner}" SET
+  upcoming_shows_count = (SELECT count(*) FROM "Show" WHERE "Show".{column} = "{owner}".id
+                          AND "Show".start_time >= (SELECT rolled_over_at FROM "ShowRollover")),
+  past_shows_count = (SELECT count(*) FROM "Show" WHERE "Show".{column} = "{owner}".id
+                      AND "Show".start_time < (SELECT rolled_over_at FROM "ShowRollover"))
+'''
+
+
+def today():
+    now = datetime.now(timezone.utc)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _name(rng, kind, i):
+    return '%s %s %s %06d' % (rng.choice(WORDS), rng.choice(WORDS), kind, i)
+
+
+def _insert(connection, table, rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        connection.execute(table.insert(), rows[start:start + chunk_size])
+
+
+def seed(connection, venues, artists, shows, seed=0, anchor=None, chunk_size=10000):
+    rng = random.Random(seed)
+    anchor = anchor or today()
+
+    _insert(connection, Genre.__table__, [
+        {'id': i, 'name': name} for i, name in enumerate(GENRES, 1)
+    ], chunk_size)
+
+    venue_rows, artist_rows, venue_genre_rows, artist_genre_rows = [], [], [], []
+    for i in range(1, venues + 1):
+        area = rng.randrange(len(CITIES))
+        venue_rows.append({
+            'id': i, 'name': _name(rng, 'Venue', i), 'city': CITIES[area], 'state': STATES[area],
+            'address': '%d Main St' % i, 'phone': '555-%07d' % i,
+            'image_link': 'https://images.example.com/venues/%d.jpg' % i,
+            'facebook_link': 'https://www.facebook.com/venue%d' % i,
+        })
+        for genre_id in rng.sample(range(1, len(GENRES) + 1), rng.randint(1, 3)):
+            venue_genre_rows.append({'venue_id': i, 'genre_id': genre_id})
+    for i in range(1, artists + 1):
+        area = rng.randrange(len(CITIES))
+        artist_rows.append({
+            'id': i, 'name': _name(rng, 'Artist', i), 'city': CITIES[area], 'state': STATES[area],
+            'phone': '555-%07d' % i, 'image_link': 'https://images.example.com/artists/%d.jpg' % i,
+            'facebook_link': 'https://www.facebook.com/artist%d' % i,
+            'seeking_venue': rng.random() < 0.5,
+        })
+        for genre_id in rng.sample(range(1, len(GENRES) + 1), rng.randint(1, 3)):
+            artist_genre_rows.append({'artist_id': i, 'genre_id': genre_id})
+
+    _insert(connection, Venue.__table__, venue_rows, chunk_size)
+    _insert(connection, Artist.__table__, artist_rows, chunk_size)
+    _insert(connection, venue_genres, venue_genre_rows, chunk_size)
+    _insert(connection, artist_genres, artist_genre_rows, chunk_size)
+
+    # shows fill one 30 minute slot each, no venue or artist is booked twice
+    # in a slot (the overlap constraints would reject it)
+    slots = 365 * 24 * 2
+    booked = set()
+
+    def show():
+        for _ in range(SHOW_ATTEMPTS):
+            venue_id, artist_id = rng.randint(1, venues), rng.randint(1, artists)
+            slot = rng.randint(-slots, slots)
+            if ('venue', venue_id, slot) not in booked and ('artist', artist_id, slot) not in booked:
+                booked.update((('venue', venue_id, slot), ('artist', artist_id, slot)))
+                start_time = anchor + timedelta(minutes=30 * slot)
+                return {'venue_id': venue_id, 'artist_id': artist_id,
+                        'start_time': start_time, 'end_time': start_time + timedelta(minutes=30)}
+        raise ValueError('no free slot after %d attempts, seed fewer shows' % SHOW_ATTEMPTS)
+
+    for start in range(0, shows, chunk_size):
+        connection.execute(Show.__table__.insert(), [
+            show() for _ in range(start, min(start + chunk_size, shows))])
+
+    for table, column in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        connection.execute(db.text(COUNT_SHOWS.format(owner=table, column=column)))
+
+    if connection.dialect.name == 'postgresql':
+        # rows were inserted with explicit ids, move the sequences past them
+        for table in ('Genre', 'Venue', 'Artist'):
+            connection.execute(db.text(
+                'SELECT setval(pg_get_serial_sequence(\'"%s"\', \'id\'), max(id)) FROM "%s"' % (table, table)))
+
+    connection.execute(db.text('ANALYZE'))
+
+
+def reset(venues, artists, shows, seed_value=0, anchor=None):
+    # drop and rebuild the schema of the configured database, then seed it
+    db.drop_all()
+    db.create_all()
+    with db.engine.begin() as connection:
+        seed(connection, venues, artists, shows, seed_value, anchor)
@@ -0,0 +1,70 @@
+"""Cold-start time of a worker, measured in fresh interpreters.
+
+Runs each statement in a new Python process, reports the median wall time
+over --runs (less the time of an empty interpreter) and the slowest imports
+from `python -X importtime`. Point --cwd at another checkout to compare
+against it, e.g. the tree before the application factory:
+
+    git worktree add /tmp/fyyur-before <revision>
+    python -m benchmarks.startup --cwd /tmp/fyyur-before --statement "import app"
+    python -m benchmarks.startup
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+STATEMENTS = [
+    # building the application, as a worker without --preload does
+    'from app import create_app; create_app()',
+    # building and warming it, as the gunicorn master with --preload does
+    'import wsgi',
+]
+
+
+def run(statement, cwd, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', statement]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=cwd, stderr=subprocess.PIPE, universal_newlines=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise SystemExit('%r failed:\n%s' % (statement, result.stderr))
+    return elapsed, result.stderr
+
+
+def slowest_imports(stderr, count):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # only top-level imports, nested ones are part of their parent's time
+        if not name.startswith('  '):
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cwd', default=os.getcwd(), help='checkout to measure')
+    parser.add_argument('--statement', action='append', help='statement to time (repeatable)')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10, help='slowest imports listed per statement')
+    args = parser.parse_args(argv)
+
+    # one untimed run so .pyc files exist and only the imports are measured
+    empty = statistics.median(run('pass', args.cwd)[0] for _ in range(args.runs))
+    for statement in args.statement or STATEMENTS:
+        run(statement, args.cwd)
+        median = statistics.median(run(statement, args.cwd)[0] for _ in range(args.runs))
+        print('%-45s %8.1f ms' % (statement, (median - empty) * 1000))
+        for cumulative, name in slowest_imports(run(statement, args.cwd, importtime=True)[1], args.top):
+            print('    %-41s %8.1f ms' % (name, cumulative / 1000.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, request, Response
+from sqlalchemy.exc import IntegrityError
+from cache import current_cache
+from models import db, Genre, Venue, Artist, Show, venue_genres, artist_genres
+from queries import filter_shows, show_filters, show_duration, show_occurrences, book_shows, venue_shows_query, artist_shows_query, split_shows, keyset_page, parse_show_cursor, format_show_cursor, dump_json
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+#  API
+#  ----------------------------------------------------------------
+
+VENUE_FIELDS = (Venue.id, Venue.name, Venue.city, Venue.state)
+VENUE_DETAIL_FIELDS = VENUE_FIELDS + (Venue.address, Venue.phone, Venue.image_link, Venue.facebook_link)
+ARTIST_FIELDS = (Artist.id, Artist.name, Artist.city, Artist.state)
+ARTIST_DETAIL_FIELDS = ARTIST_FIELDS + (Artist.phone, Artist.image_link, Artist.facebook_link,
+  Artist.website, Artist.seeking_venue, Artist.seeking_description)
+SHOW_FIELDS = (Show.id, Show.start_time, Show.end_time, Show.venue_id, Venue.name.label('venue_name'),
+  Show.artist_id, Artist.name.label('artist_name'))
+
+def json_response(payload, status=200):
+  # the body is hashed into an ETag so a client holding it gets a bodyless 304
+  response = Response(dump_json(payload), status=status, mimetype='application/json')
+  if status == 200:
+    response.add_etag()
+    response.make_conditional(request)
+  return response
+
+def api_page(query, keys, parse_cursor, format_cursor):
+  page = keyset_page(query, keys, parse_cursor, format_cursor)
+  return json_response({
+    "data": [row._asdict() for row in page['items']],
+    "prev": page['prev'],
+    "next": page['next']
+  })
+
+def api_not_found():
+  return json_response({"error": "not found"}, status=404)
+
+def genre_names_of(association, owner_column, owner_id):
+  return [name for name, in db.session.query(Genre.name)
+    .join(association, association.c.genre_id == Genre.id)
+    .filter(association.c[owner_column] == owner_id)
+    .order_by(Genre.name)]
+
+def api_shows_query():
+  return db.session.query(*SHOW_FIELDS) \
+    .join(Venue, Venue.id == Show.venue_id) \
+    .join(Artist, Artist.id == Show.artist_id)
+
+@bp.route('/venues')
+def api_venues():
+  return api_page(db.session.query(*VENUE_FIELDS), [Venue.id], int, lambda venue: str(venue.id))
+
+@bp.route('/venues/<int:venue_id>')
+def api_venue(venue_id):
+  venue = db.session.query(*VENUE_DETAIL_FIELDS).filter(Venue.id == venue_id).first()
+  if venue is None:
+    return api_not_found()
+  data = venue._asdict()
+  data['genres'] = genre_names_of(venue_genres, 'venue_id', venue_id)
+  data['past_shows'], data['upcoming_shows'] = split_shows(venue_shows_query(venue_id))
+  return json_response(data)
+
+@bp.route('/artists')
+def api_artists():
+  return api_page(db.session.query(*ARTIST_FIELDS), [Artist.id], int, lambda artist: str(artist.id))
+
+@bp.route('/artists/<int:artist_id>')
+def api_artist(artist_id):
+  artist = db.session.query(*ARTIST_DETAIL_FIELDS).filter(Artist.id == artist_id).first()
+  if artist is None:
+    return api_not_found()
+  data = artist._asdict()
+  data['genres'] = genre_names_of(artist_genres, 'artist_id', artist_id)
+  data['past_shows'], data['upcoming_shows'] = split_shows(artist_shows_query(artist_id))
+  return json_response(data)
+
+@bp.route('/shows')
+def api_shows():
+  return api_page(filter_shows(api_shows_query(), *show_filters()), [Show.start_time, Show.id], parse_show_cursor, format_show_cursor)
+
+@bp.route('/shows', methods=['POST'])
+def api_create_shows():
+  # {"venue_id", "artist_id", "start_time", "recurrence", "dates", "duration"}:
+  # books every occurrence or, on a 409, none and reports the conflicting ones
+  booking = request.get_json(silent=True) or {}
+  try:
+    venue_id, artist_id = int(booking['venue_id']), int(booking['artist_id'])
+    start_times = show_occurrences(booking.get('start_time'), booking.get('recurrence'), booking.get('dates') or [])
+    duration = show_duration(booking.get('duration'))
+  except (KeyError, TypeError, ValueError) as e:
+    return json_response({"error": "invalid booking: %s" % e}, status=400)
+  if db.session.query(Venue.id).filter(Venue.id == venue_id).scalar() is None or \
+      db.session.query(Artist.id).filter(Artist.id == artist_id).scalar() is None:
+    return api_not_found()
+
+  try:
+    report = book_shows(venue_id, artist_id, start_times, duration)
+    occurrences = [{"start_time": start, "end_time": end, "conflicts": conflicts} for start, end, conflicts in report]
+    if any(conflicts for _, _, conflicts in report):
+      db.session.rollback()
+      return json_response({"error": "conflict", "occurrences": occurrences}, status=409)
+    db.session.commit()
+  except IntegrityError:
+    # booked concurrently, between the conflict check and the insert
+    db.session.rollback()
+    return json_response({"error": "conflict"}, status=409)
+  current_cache().invalidate('shows', 'venues')
+  return json_response({"occurrences": occurrences}, status=201)
+
+@bp.route('/shows/<int:show_id>')
+def api_show(show_id):
+  show = api_shows_query().filter(Show.id == show_id).first()
+  if show is None:
+    return api_not_found()
+  return json_response(show._asdict())
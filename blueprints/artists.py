@@ -0,0 +1,182 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import sys
+from flask import Blueprint, render_template, request, flash, redirect, url_for, abort
+from sqlalchemy import func
+from autocomplete import current_autocomplete
+from cache import current_cache
+from models import db, Genre, Venue, Artist, Show, artist_genres
+from queries import search_by_name, write_genres, artist_shows_query, split_shows, detail_validators, not_modified, with_validators, keyset_page, cached_page
+from replicas import read_only
+
+bp = Blueprint('artists', __name__)
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+#  Artists
+#  ----------------------------------------------------------------
+
+@bp.route('/artists')
+def artists():
+  def render():
+    page = keyset_page(Artist.query, [Artist.id], int, lambda artist: str(artist.id))
+    tags = ['artist:%d' % artist.id for artist in page['items']]
+    # new artists get the highest id, so they only ever land on the last page
+    if not page['next']:
+      tags.append('artists:tail')
+    return render_template('pages/artists.html', artists=page['items'], page=page), tags
+
+  return cached_page(render)
+
+@bp.route('/artists/search', methods=['POST'])
+@read_only
+def search_artists():
+  # TODO implement search on artists with partial string search. Ensure it is case-insensitive.
+  # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+  # search for "band" should return "The Wild Sax Band".
+  search_term = (request.form.get('search_term', ''))
+  search_result = search_by_name(Artist, search_term)
+
+  response={
+    "count": len(search_result),
+    "data": search_result
+  }
+  return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''))
+
+@bp.route('/artists/<int:artist_id>')
+def show_artist(artist_id):
+  # shows the venue page with the given venue_id
+  # TODO replace with real venue data from the venues table, using venue_id
+
+      #TODO  divide all shows into past & upcoming based on show date
+      #       implement past/upcoming show count based on the query 
+  validators = detail_validators(Artist, Show.artist_id, Venue, Show.venue_id, artist_id)
+  if validators is None:
+    abort(404)
+  response = not_modified(*validators)
+  if response is not None:
+    return response
+
+  artist = Artist.query.get(artist_id)
+  
+
+  past_shows, upcoming_shows = split_shows(artist_shows_query(artist.id))
+
+  # past_shows_count and upcoming_shows_count are the artist's counters
+  artist.past_shows = past_shows
+  artist.upcoming_shows = upcoming_shows
+  
+
+  
+  return with_validators(render_template('pages/show_artist.html', artist=artist), *validators)
+  # TODO UPCOMING & PAST Shows
+
+#  Update
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+  from forms import ArtistForm
+  form = ArtistForm()
+  artist = Artist.query.get(artist_id)
+  # TODO  populate form with fields from artist with ID <artist_id>
+  return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+  # TODO take values from the form submitted, and update existing
+  # artist record with ID <artist_id> using the new attributes
+    artistForm = request.form.copy()
+    error = False
+
+    try:
+      artist = Artist.query.get(artist_id)
+
+      artist.name=artistForm['name']
+      artist.city=artistForm['city']
+      artist.state=artistForm['state']
+      artist.phone=artistForm['phone']
+      artist.facebook_link=artistForm['facebook_link']
+      artist.image_link=artistForm['image_link']
+      write_genres(artist_genres, 'artist_id', artist_id, artistForm.getlist('genres'))
+      # genre rows are written outside the ORM, so bump the row explicitly
+      artist.updated_at = func.now()
+
+      db.session.commit()
+      current_cache().invalidate('artist:%d' % artist_id)
+      current_autocomplete().add(Artist, artist_id, artistForm['name'])
+
+    except:
+      db.session.rollback()
+      error = True
+      print(sys.exc_info())
+    
+    finally:
+      db.session.close()
+      if error:
+        flash('An error occurred. Artist ' + request.form['name'] + ' could not be edited.')
+        return redirect(url_for('artists.show_artist', artist_id=artist_id))
+      else:
+        flash('Artist ' + request.form['name'] + ' was successfully edited!')
+        return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+  from forms import ArtistForm
+  form = ArtistForm()
+  return render_template('forms/new_artist.html', form=form)
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+  # called upon submitting the new artist listing form
+  # TODO insert form data as a new Venue record in the db, instead
+  # TODO modify data to be the data object returned from db insertion
+  artistForm = request.form.copy()
+  error = False
+  try:
+    newArtist = Artist(name=artistForm['name'], 
+      city=artistForm['city'], state=artistForm['state'], phone=artistForm['phone'],
+      facebook_link=artistForm['facebook_link'], image_link=artistForm['image_link'])
+
+    db.session.add(newArtist)
+    db.session.flush()
+    write_genres(artist_genres, 'artist_id', newArtist.id, artistForm.getlist('genres'))
+    db.session.commit()
+    current_cache().invalidate('artists:tail')
+    current_autocomplete().add(Artist, newArtist.id, newArtist.name)
+  except:
+    db.session.rollback()
+    error = True
+    print(sys.exc_info())
+  finally:  
+    db.session.close()
+    if error:
+      flash('An error occurred. Artist ' + request.form['name'] + ' could not be listed.')
+      return render_template('pages/home.html')
+    else:
+      flash('Artist ' + request.form['name'] + ' was successfully listed!')
+      return render_template('pages/home.html')
+
+  # on successful db insert, flash success
+  # TODO on unsuccessful db insert, flash an error instead.
+  # e.g., flash('An error occurred. Artist ' + data.name + ' could not be listed.')
+
+#  Genres
+#  ----------------------------------------------------------------
+
+@bp.route('/genres/<name>/artists')
+def genre_artists(name):
+  artists_in_genre = Artist.query \
+    .join(artist_genres, artist_genres.c.artist_id == Artist.id) \
+    .join(Genre, Genre.id == artist_genres.c.genre_id) \
+    .filter(Genre.name == name)
+  page = keyset_page(artists_in_genre, [Artist.id], int, lambda artist: str(artist.id))
+
+  return render_template('pages/artists.html', artists=page['items'], page=page, genre=name)
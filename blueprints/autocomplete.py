@@ -0,0 +1,33 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, current_app, request, Response
+from autocomplete import current_autocomplete
+from models import Venue, Artist
+from queries import dump_json
+
+bp = Blueprint('autocomplete', __name__, url_prefix='/autocomplete')
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+#  Autocomplete
+#  ----------------------------------------------------------------
+
+def suggestions(model):
+  # {"data": [{"id", "name"}, ...]} of the names matching ?q=, at most ?limit=
+  limit = min(request.args.get('limit', current_app.config['AUTOCOMPLETE_LIMIT'], type=int),
+              current_app.config['AUTOCOMPLETE_MAX_LIMIT'])
+  matches = current_autocomplete().search(model, request.args.get('q', ''), max(limit, 0))
+  return Response(dump_json({"data": [{"id": id, "name": name} for id, name in matches]}),
+                  mimetype='application/json')
+
+@bp.route('/artists')
+def autocomplete_artists():
+  return suggestions(Artist)
+
+@bp.route('/venues')
+def autocomplete_venues():
+  return suggestions(Venue)
@@ -0,0 +1,25 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, current_app, render_template, jsonify
+from cache import current_cache
+
+bp = Blueprint('main', __name__)
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+@bp.route('/')
+def index():
+  return render_template('pages/home.html')
+
+#  Cache
+#  ----------------------------------------------------------------
+
+@bp.route('/cache/stats')
+def cache_stats():
+  stats = current_cache().stats()
+  stats['fragments'] = current_app.extensions['fragment_cache'].stats()
+  return jsonify(stats)
@@ -0,0 +1,142 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, current_app, render_template, request, Response, flash, abort, stream_with_context
+from sqlalchemy.orm import joinedload
+from cache import current_cache
+from models import db, Venue, Artist, Show
+from queries import count_shows, filter_shows, show_filters, show_duration, show_occurrences, book_shows, keyset_page, parse_show_cursor, format_show_cursor, cached_page, export_shows_query, export_lines, EXPORT_FORMATS
+
+bp = Blueprint('shows', __name__)
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+def shows():
+  # displays list of shows at /shows
+  # TODO replace with real venues data.
+  #       num_shows should be aggregated based on number of upcoming shows per venue.
+
+  def render():
+    # venue and artist ride along in the same query instead of a lazy load per tile
+    shows_with_owners = filter_shows(Show.query.options(joinedload(Show.venue), joinedload(Show.artist)),
+                                     *show_filters())
+    page = keyset_page(shows_with_owners, [Show.start_time, Show.id], parse_show_cursor, format_show_cursor)
+    # a new show can start at any time and so land on any page
+    tags = {'shows'}
+    for show in page['items']:
+      tags.update(('venue:%d' % show.venue_id, 'artist:%d' % show.artist_id))
+    return render_template('pages/shows.html', shows=page['items'], page=page), tags
+
+  return cached_page(render)
+
+# conflicting dates named in the flash message, the rest are counted
+CONFLICTS_SHOWN = 10
+
+@bp.route('/shows/create')
+def create_shows():
+  # renders form. do not touch.
+  from forms import ShowForm
+  form = ShowForm()
+  return render_template('forms/new_show.html', form=form)
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+  # called to create new shows in the db, upon submitting new show listing form
+  # TODO insert form data as a new Show record in the db, instead
+  form_data = request.form.copy()
+  error = False
+  invalid = None
+  conflicts = []
+
+  try:
+    artist = Artist.query.get(form_data['artist_id'])
+    venue = Venue.query.get(form_data['venue_id'])
+    # the start time plus a recurrence rule and/or a list of extra dates
+    start_times = show_occurrences(form_data.get('start_time'), form_data.get('recurrence'),
+                                   form_data.get('dates', ''))
+
+    report = book_shows(venue.id, artist.id, start_times, show_duration(form_data.get('duration')))
+    conflicts = [(start, names) for start, _, names in report if names]
+    if not conflicts:
+      db.session.commit()
+      current_cache().invalidate('shows', 'venues')
+
+  except ValueError as e:
+    db.session.rollback()
+    invalid = str(e)
+
+  except:
+    db.session.rollback()
+    error = True
+    current_app.logger.exception('listing shows failed')
+
+  finally:
+    db.session.close()
+    if error:
+      flash('An error occurred. Show could not be listed.')
+      # abort(400)
+      return render_template('pages/home.html')
+    elif invalid:
+      flash('Show could not be listed, %s.' % invalid)
+      return render_template('pages/home.html')
+    elif conflicts:
+      dates = ', '.join('%s (%s)' % (start.strftime('%Y-%m-%d %H:%M'), ' and '.join(names))
+                        for start, names in conflicts[:CONFLICTS_SHOWN])
+      if len(conflicts) > CONFLICTS_SHOWN:
+        dates += ' and %d more' % (len(conflicts) - CONFLICTS_SHOWN)
+      flash('Show could not be listed, already booked on %s.' % dates)
+      return render_template('pages/home.html')
+    elif len(start_times) > 1:
+      flash('%d shows were successfully listed!' % len(start_times))
+      return render_template('pages/home.html')
+    else:
+      flash('Show was successfully listed!')
+      return render_template('pages/home.html')
+
+  # on successful db insert, flash success
+  # TODO on unsuccessful db insert, flash an error instead.
+  # e.g., flash('An error occurred. Show could not be listed.')
+  # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+
+@bp.route('/shows/<int:show_id>', methods=['DELETE'])
+def delete_show(show_id):
+  showToDelete = Show.query.get(show_id)
+  if showToDelete is None:
+    abort(404)
+  error = False
+  try:
+    # uncount the show while its row is still there to classify
+    count_shows([show_id], -1)
+    db.session.delete(showToDelete)
+    db.session.commit()
+    current_cache().invalidate('shows', 'venues')
+  except:
+    db.session.rollback()
+    error = True
+    current_app.logger.exception('deleting show %d failed', show_id)
+  finally:
+    db.session.close()
+  if error:
+    flash('an error occured while deleting the Show!')
+  else:
+    flash('Show was successfully deleted!')
+  return render_template('pages/home.html')
+
+#  Export
+#  ----------------------------------------------------------------
+
+@bp.route('/export/shows.<format>')
+def export_shows(format):
+  if format not in EXPORT_FORMATS:
+    abort(404)
+  query = export_shows_query(*show_filters())
+  return Response(stream_with_context(export_lines(query, format)),
+    mimetype=EXPORT_FORMATS[format],
+    headers={'Content-Disposition': 'attachment; filename=shows.%s' % format})
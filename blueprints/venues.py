@@ -0,0 +1,226 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import sys
+from itertools import groupby
+from flask import Blueprint, render_template, request, flash, redirect, url_for, abort
+from sqlalchemy import func
+from autocomplete import current_autocomplete
+from cache import current_cache
+from models import db, Genre, Venue, Artist, Show, venue_genres
+from queries import search_by_name, write_genres, venue_shows_query, split_shows, detail_validators, not_modified, with_validators, cached_page
+from replicas import read_only
+
+bp = Blueprint('venues', __name__)
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+def venues():
+  def render():
+    # every venue with its upcoming show counter, ordered so that venues of
+    # the same area are adjacent and can be grouped in one pass.
+    all_venues = db.session.query(
+        Venue.id, Venue.name, Venue.city, Venue.state,
+        Venue.upcoming_shows_count.label('num_upcoming_shows')
+      ).order_by(Venue.state, Venue.city, Venue.id) \
+      .all()
+
+    data = []
+    for (city, state), area_venues in groupby(all_venues, key=lambda venue: (venue.city, venue.state)):
+      data.append({
+        "city": city,
+        "state": state,
+        "venues": [{
+          "id": venue.id,
+          "name": venue.name,
+          "num_upcoming_shows": venue.num_upcoming_shows
+        } for venue in area_venues]
+      })
+    return render_template('pages/venues.html', areas=data), ['venues']
+
+  return cached_page(render)
+
+@bp.route('/venues/search', methods=['POST'])
+@read_only
+def search_venues():
+  # TODO implement search on artists with partial string search. Ensure it is case-insensitive.
+  # seach for Hop should return "The Musical Hop".
+  # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+  search_term = (request.form.get('search_term', ''))
+  search_result = search_by_name(Venue, search_term)
+
+  response={
+    "count": len(search_result),
+    "data": search_result
+  }
+  return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''))
+
+@bp.route('/venues/<int:venue_id>')
+def show_venue(venue_id):
+  # shows the venue page with the given venue_id
+  # TODO replace with real venue data from the venues table, using venue_id
+  validators = detail_validators(Venue, Show.venue_id, Artist, Show.artist_id, venue_id)
+  if validators is None:
+    abort(404)
+  response = not_modified(*validators)
+  if response is not None:
+    return response
+
+  venue = Venue.query.get(venue_id)
+
+  past_shows, upcoming_shows = split_shows(venue_shows_query(venue.id))
+
+  # past_shows_count and upcoming_shows_count are the venue's counters
+  venue.past_shows = past_shows
+  venue.upcoming_shows = upcoming_shows
+
+
+  return with_validators(render_template('pages/show_venue.html', venue=venue), *validators)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+  from forms import VenueForm
+  form = VenueForm()
+  return render_template('forms/new_venue.html', form=form)
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+  # TODO insert form data as a new Venue record in the db, instead
+  # TODO modify data to be the data object returned from db insertion
+  venueForm = request.form.copy()
+  error = False
+  try:
+    newVenue = Venue(name=venueForm['name'], 
+      city=venueForm['city'], state=venueForm['state'], address=venueForm['address'], 
+      phone=venueForm['phone'], facebook_link=venueForm['facebook_link'], image_link=venueForm['image_link'])
+
+    db.session.add(newVenue)
+    db.session.flush()
+    write_genres(venue_genres, 'venue_id', newVenue.id, venueForm.getlist('genres'))
+    db.session.commit()
+    current_cache().invalidate('venues')
+    current_autocomplete().add(Venue, newVenue.id, newVenue.name)
+  except:
+    db.session.rollback()
+    error = True
+    print(sys.exc_info())
+  finally:  
+    db.session.close()
+    if error:
+      flash('An error occurred. Venue ' + request.form['name'] + ' could not be listed.')
+      return render_template('pages/home.html')
+    else:
+      flash('Venue ' + request.form['name'] + ' was successfully listed!')
+      return render_template('pages/home.html')
+
+  # on successful db insert, flash success
+  # TODO on unsuccessful db insert, flash an error instead.
+  # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+  # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+
+@bp.route('/venues/<venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+  # TODO Complete this endpoint for taking a venue_id, and using
+  # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+  venueName = ""
+  error = False
+  try:
+    venueToDelete = Venue.query.get(venue_id)
+    venueName = venueToDelete.name
+    db.session.delete(venueToDelete)
+    db.session.commit()
+    current_cache().invalidate('venues', 'venue:%s' % venue_id)
+    current_autocomplete().remove(Venue, int(venue_id))
+  except:
+    db.session.rollback()
+    error = True
+    print(sys.exc_info())
+  finally:
+    db.session.close()
+  if error:
+    flash('an error occured while deleting Venue ' + venueName + '!')
+    return render_template('pages/home.html')
+  else:
+    flash('Venue ' + venueName + ' was successfully deleted!')
+    return render_template('pages/home.html')
+    # return redirect(url_for('main.index'))
+
+#  Update
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+  from forms import VenueForm
+  form = VenueForm()
+  venue = Venue.query.get(venue_id)
+  # TODO  populate form with fields from venue with ID <venue_ID>
+  return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+  # TODO take values from the form submitted, and update existing
+  # venue record with ID <venue_id> using the new attributes
+    venueForm = request.form.copy()
+    error = False
+
+    try:
+      venue = Venue.query.get(venue_id)
+
+      venue.name=venueForm['name']
+      venue.city=venueForm['city']
+      venue.state=venueForm['state']
+      venue.phone=venueForm['phone']
+      venue.facebook_link=venueForm['facebook_link']
+      venue.image_link=venueForm['image_link']
+      write_genres(venue_genres, 'venue_id', venue_id, venueForm.getlist('genres'))
+      # genre rows are written outside the ORM, so bump the row explicitly
+      venue.updated_at = func.now()
+
+      db.session.commit()
+      current_cache().invalidate('venues', 'venue:%d' % venue_id)
+      current_autocomplete().add(Venue, venue_id, venueForm['name'])
+
+    except:
+      db.session.rollback()
+      error = True
+      print(sys.exc_info())
+    
+    finally:
+      db.session.close()
+      if error:
+        flash('An error occurred. Venue ' + request.form['name'] + ' could not be edited.')
+        return redirect(url_for('venues.show_venue', venue_id=venue_id))
+      else:
+        flash('Venue ' + request.form['name'] + ' was successfully edited!')
+        return redirect(url_for('venues.show_venue', venue_id=venue_id))
+
+#  Genres
+#  ----------------------------------------------------------------
+
+@bp.route('/genres/<name>/venues')
+def genre_venues(name):
+  venues_in_genre = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state) \
+    .join(venue_genres, venue_genres.c.venue_id == Venue.id) \
+    .join(Genre, Genre.id == venue_genres.c.genre_id) \
+    .filter(Genre.name == name) \
+    .order_by(Venue.state, Venue.city, Venue.id) \
+    .all()
+
+  data = []
+  for (city, state), area_venues in groupby(venues_in_genre, key=lambda venue: (venue.city, venue.state)):
+    data.append({
+      "city": city,
+      "state": state,
+      "venues": [{"id": venue.id, "name": venue.name} for venue in area_venues]
+    })
+  return render_template('pages/venues.html', areas=data, genre=name)
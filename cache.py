@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+
+from flask import current_app
+
+
+class CacheBackend(object):
+    '''Interface for page cache storage.
+
+    Entries are stored under a key together with a set of tags; invalidating
+    a tag drops every entry stored with it. A backend shared between workers
+    (e.g. one backed by Redis or memcached) implements these methods and is
+    selected with the PAGE_CACHE_BACKEND setting.
+    '''
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, tags=()):
+        raise NotImplementedError
+
+    def invalidate(self, *tags):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    '''In-process LRU cache whose entries expire after `ttl` seconds.'''
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}                # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags=()):
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries)
+            }
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+def create_cache(config, prefix='PAGE_CACHE'):
+    # <prefix>_BACKEND is a dotted path to a CacheBackend subclass,
+    # <prefix>_OPTIONS the keyword arguments it is built with.
+    module_name, _, class_name = config[prefix + '_BACKEND'].rpartition('.')
+    backend = getattr(import_module(module_name), class_name)
+    return backend(**config.get(prefix + '_OPTIONS', {}))
+
+
+def init_app(app):
+    app.extensions['page_cache'] = create_cache(app.config)
+
+
+def current_cache():
+    '''The page cache of the current application.'''
+    return current_app.extensions['page_cache']
@@ -0,0 +1,297 @@
+'''`flask fyyur ...` maintenance commands.'''
+import csv
+import io
+import json
+import os
+import time
+from datetime import timedelta
+from itertools import islice
+
+import click
+from flask.cli import AppGroup
+
+from sqlalchemy import func, case, or_
+
+from models import db, Venue, Artist, Show, ShowRollover, DEFAULT_SHOW_DURATION, venue_genres, artist_genres
+from cache import current_cache
+from queries import genre_ids, adjust_counters, export_shows_query, export_lines
+
+fyyur_cli = AppGroup('fyyur', help='Fyyur catalog maintenance commands.')
+
+VENUE_COLUMNS = ('name', 'city', 'state', 'address', 'phone', 'image_link', 'facebook_link')
+ARTIST_COLUMNS = ('name', 'city', 'state', 'phone', 'image_link', 'facebook_link',
+                  'website', 'seeking_venue', 'seeking_description')
+# (model, Show column referencing it) of the show counters
+COUNTED = ((Venue, Show.venue_id), (Artist, Show.artist_id))
+
+
+def read_records(path):
+    # stream dicts from a .csv or .jsonl file without loading it whole
+    with open(path, newline='', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            for record in csv.DictReader(f):
+                yield record
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunks(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def split_genres(value):
+    if isinstance(value, (list, tuple)):
+        return [genre.strip() for genre in value if genre and genre.strip()]
+    return [genre.strip() for genre in (value or '').split(',') if genre.strip()]
+
+
+def parse_start_time(value):
+    # dateutil is only loaded by the commands that parse dates
+    import dateutil.parser
+    from dateutil import tz
+    # stored in UTC, naive times are taken to be UTC already
+    start_time = dateutil.parser.parse(value)
+    if start_time.tzinfo is None:
+        return start_time.replace(tzinfo=tz.tzutc())
+    return start_time.astimezone(tz.tzutc())
+
+
+def parse_end_time(record, start_time):
+    # an explicit end_time, else start_time plus `duration` minutes
+    if record.get('end_time'):
+        return parse_start_time(record['end_time'])
+    return start_time + timedelta(minutes=int(record.get('duration') or DEFAULT_SHOW_DURATION))
+
+
+def parse_bool(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    return str(value).strip().lower() in ('1', 'true', 't', 'yes', 'y')
+
+
+def reference(record, kind):
+    # shows name their venue/artist by `<kind>_id` or by `<kind>` (the name)
+    value = record.get(kind + '_id')
+    return str(value if value not in (None, '') else record.get(kind))
+
+
+def resolve(model, references):
+    # map every id or name in `references` to an id with a single query
+    ids = {reference for reference in references if reference.isdigit()}
+    names = set(references) - ids
+    rows = db.session.query(model.id, model.name).filter(
+        db.or_(model.id.in_([int(i) for i in ids]), model.name.in_(names))
+    )
+    resolved = {}
+    for row in rows:
+        resolved[str(row.id)] = row.id
+        resolved[row.name] = row.id
+    return resolved
+
+
+def import_owners(model, association, owner_column, columns, chunk):
+    # names are unique: records without one, or with one that is taken, are skipped
+    names = {record.get('name') for record in chunk if record.get('name')}
+    taken = {name for name, in db.session.query(model.name).filter(model.name.in_(names))}
+    values = []
+    genres = []  # the genre names of each row in values
+    for record in chunk:
+        if not record.get('name') or record['name'] in taken:
+            continue
+        taken.add(record['name'])
+        row = {column: record.get(column) or None for column in columns}
+        if 'seeking_venue' in row:
+            row['seeking_venue'] = parse_bool(row['seeking_venue'])
+        values.append(row)
+        genres.append(split_genres(record.get('genres')))
+    if not values:
+        return 0
+    # genres go to the ids the insert returned
+    table = model.__table__
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # RETURNING yields the ids in the order of the VALUES rows
+        ids = [row.id for row in db.session.execute(table.insert().values(values).returning(table.c.id))]
+    else:
+        ids = [db.session.execute(table.insert().values(row)).inserted_primary_key[0] for row in values]
+    genre_id = genre_ids(set().union(*genres))
+    pairs = [(owner_id, genre_id[genre]) for owner_id, names in zip(ids, genres) for genre in names]
+    if pairs:
+        db.session.execute(association.insert(), [
+            {owner_column: owner_id, 'genre_id': genre_id} for owner_id, genre_id in pairs
+        ])
+    return len(values)
+
+
+def copy_shows(rows):
+    # COPY is the fastest way into Postgres, fed from an in-memory CSV buffer
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow((row['venue_id'], row['artist_id'], row['start_time'].isoformat(),
+                         row['end_time'].isoformat()))
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert('COPY "Show" (venue_id, artist_id, start_time, end_time) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+
+def import_shows(chunk):
+    venues = resolve(Venue, {reference(record, 'venue') for record in chunk})
+    artists = resolve(Artist, {reference(record, 'artist') for record in chunk})
+
+    rows = []
+    for record in chunk:
+        venue_id = venues.get(reference(record, 'venue'))
+        artist_id = artists.get(reference(record, 'artist'))
+        if venue_id is None or artist_id is None:
+            continue
+        start_time = parse_start_time(record['start_time'])
+        rows.append({'venue_id': venue_id, 'artist_id': artist_id,
+                     'start_time': start_time, 'end_time': parse_end_time(record, start_time)})
+
+    if rows:
+        if db.session.get_bind().dialect.name == 'postgresql':
+            copy_shows(rows)
+        else:
+            db.session.execute(Show.__table__.insert().values(rows))
+    return len(rows)
+
+
+@fyyur_cli.command('import')
+@click.argument('kind', type=click.Choice(['venues', 'artists', 'shows']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per insert and commit.')
+def import_command(kind, path, batch_size):
+    '''Bulk load venues, artists or shows from a CSV or JSONL file.
+
+    Venues and artists without a name, or with one already taken, are skipped. Shows reference their
+    venue and artist by id (venue_id/artist_id) or by name (venue/artist);
+    rows whose references cannot be resolved are skipped.
+    '''
+    if kind == 'venues':
+        load = lambda chunk: import_owners(Venue, venue_genres, 'venue_id', VENUE_COLUMNS, chunk)
+    elif kind == 'artists':
+        load = lambda chunk: import_owners(Artist, artist_genres, 'artist_id', ARTIST_COLUMNS, chunk)
+    else:
+        load = import_shows
+
+    started = time.perf_counter()
+    read = inserted = 0
+    for chunk in chunks(read_records(path), batch_size):
+        inserted += load(chunk)
+        db.session.commit()
+        read += len(chunk)
+        elapsed = time.perf_counter() - started
+        click.echo('%d rows read, %d inserted, %.0f rows/sec' % (read, inserted, inserted / elapsed))
+
+    if kind == 'shows':
+        # one recount is cheaper than counting every chunk as it is copied in
+        repair_counters(list(drifted_counters()))
+        db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    click.echo('Imported %d of %d %s in %.1fs (%.0f rows/sec), skipped %d.' % (
+        inserted, read, kind, elapsed, inserted / elapsed if elapsed else 0, read - inserted))
+
+
+@fyyur_cli.command('export')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--format', 'format', type=click.Choice(['csv', 'jsonl']), default='csv', show_default=True)
+@click.option('--from', 'start', help='Only shows starting at or after this date.')
+@click.option('--to', 'end', help='Only shows starting before this date.')
+@click.option('--venue-id', type=int)
+@click.option('--artist-id', type=int)
+def export_command(output, format, start, end, venue_id, artist_id):
+    '''Stream shows with their venue and artist to OUTPUT (default stdout).'''
+    query = export_shows_query(
+        parse_start_time(start) if start else None,
+        parse_start_time(end) if end else None,
+        venue_id, artist_id)
+    for chunk in export_lines(query, format):
+        output.write(chunk)
+
+
+@fyyur_cli.command('rollover')
+def rollover_command():
+    '''Move shows that have started from the upcoming to the past counters.
+
+    Only the shows starting since the previous rollover are read, a range
+    scan of the start_time index. Schedule it every minute or so: venue and
+    artist pages list a show as upcoming until it has been rolled over.
+    An in-process page cache of a running server is not reached from here,
+    its /venues pages catch up when they expire.
+    '''
+    # the database clock, the one server_default=now() uses too
+    now = db.session.query(func.now()).scalar()
+    rollover = ShowRollover.query.with_for_update().one()
+    started = (Show.start_time >= rollover.rolled_over_at) & (Show.start_time < now)
+
+    rolled_over = {}
+    for model, owner_column in COUNTED:
+        counts = db.session.query(owner_column, func.count(Show.id)) \
+            .filter(started) \
+            .group_by(owner_column) \
+            .all()
+        rolled_over[model] = 0
+        for owner_id, count in counts:
+            adjust_counters(model, owner_id, -count, count)
+            rolled_over[model] += count
+
+    rollover.rolled_over_at = now
+    db.session.commit()
+    # /venues lists the upcoming counts
+    current_cache().invalidate('venues')
+    # every show has one venue, so the venue pass sees each started show once
+    click.echo('Rolled over %d shows.' % rolled_over[Venue])
+
+
+def drifted_counters():
+    # (model, id, stored upcoming, stored past, actual upcoming, actual past)
+    # of every venue and artist whose counters disagree with its shows
+    watermark = db.session.query(ShowRollover.rolled_over_at).with_for_update(read=True).scalar()
+    upcoming = func.coalesce(func.sum(case([(Show.start_time >= watermark, 1)], else_=0)), 0)
+    past = func.coalesce(func.sum(case([(Show.start_time < watermark, 1)], else_=0)), 0)
+    for model, owner_column in COUNTED:
+        rows = db.session.query(model.id, model.upcoming_shows_count, model.past_shows_count, upcoming, past) \
+            .outerjoin(Show, owner_column == model.id) \
+            .group_by(model.id) \
+            .having(or_(model.upcoming_shows_count != upcoming, model.past_shows_count != past))
+        for row in rows.all():
+            yield (model,) + tuple(row)
+
+
+def repair_counters(drifted):
+    for model, owner_id, stored_upcoming, stored_past, actual_upcoming, actual_past in drifted:
+        adjust_counters(model, owner_id, actual_upcoming - stored_upcoming, actual_past - stored_past)
+
+
+@fyyur_cli.command('check-counters')
+@click.option('--dry-run', is_flag=True, help='Only report drift, leave the counters as they are.')
+@click.pass_context
+def check_counters_command(ctx, dry_run):
+    '''Recount the shows of every venue and artist and repair drifted counters.
+
+    Shows created while the check runs may be miscounted again; rerun it
+    if it reported drift under write traffic.
+    '''
+    drifted = list(drifted_counters())
+    for model, owner_id, stored_upcoming, stored_past, actual_upcoming, actual_past in drifted:
+        click.echo('%s %d: upcoming %d -> %d, past %d -> %d' % (
+            model.__tablename__, owner_id, stored_upcoming, actual_upcoming, stored_past, actual_past))
+
+    if dry_run:
+        db.session.rollback()
+        click.echo('%d counters drifted.' % len(drifted))
+        ctx.exit(1 if drifted else 0)
+    repair_counters(drifted)
+    db.session.commit()
+    click.echo('Repaired %d counters.' % len(drifted))
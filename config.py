@@ -1,5 +1,7 @@
 import os
-SECRET_KEY = os.urandom(32)
+# Sessions and CSRF tokens are signed with SECRET_KEY, so every worker has to
+# use the same one. Set it in the environment outside of development.
+SECRET_KEY = os.environ.get('SECRET_KEY', 'dev')
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
@@ -12,4 +14,48 @@ DEBUG = True
 # TODO IMPLEMENT DATABASE URL
 SQLALCHEMY_DATABASE_URI = 'postgresql://mohammedghawanni@localhost:5432/fyyur'
 
-SQLALCHEMY_TRACK_MODIFICATIONS=False
\ No newline at end of file
+SQLALCHEMY_TRACK_MODIFICATIONS=False
+
+# Maximum number of venues/artists returned by a name search
+SEARCH_RESULT_LIMIT = 50
+
+# Name suggestions of /autocomplete/artists and /autocomplete/venues. A
+# background thread of each worker rebuilds its in-memory indexes this often
+# (seconds) to pick up names written through the other workers; 0 disables it.
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+AUTOCOMPLETE_REFRESH = 300
+
+# Keyset pagination of the /artists and /shows listings
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Rendered-page cache for the /venues, /artists and /shows listings.
+# Point PAGE_CACHE_BACKEND at another cache.CacheBackend to share it between workers.
+PAGE_CACHE_BACKEND = 'cache.LRUCache'
+PAGE_CACHE_OPTIONS = {'max_entries': 1024, 'ttl': 300}
+
+# Rendered {% cache %} fragments (show and artist tiles). Their keys include
+# the rows' revisions, so entries never go stale and only age out of the LRU.
+FRAGMENT_CACHE_BACKEND = 'cache.LRUCache'
+FRAGMENT_CACHE_OPTIONS = {'max_entries': 20000, 'ttl': 86400}
+
+# Compiled templates are cached here; fill it with `flask templates compile`.
+# Set to None to compile in every worker.
+TEMPLATE_BYTECODE_CACHE = os.path.join(basedir, '.jinja_cache')
+
+# Read replicas. Name binds in SQLALCHEMY_BINDS and list them here to send
+# read-only requests to them round-robin, e.g.
+#   SQLALCHEMY_BINDS = {'replica_1': 'postgresql://...', 'replica_2': 'postgresql://...'}
+#   SQLALCHEMY_REPLICA_BINDS = ['replica_1', 'replica_2']
+SQLALCHEMY_REPLICA_BINDS = []
+# How long a client that just wrote keeps reading from the primary
+READ_YOUR_WRITES_SECONDS = 5
+
+# Per-request SQL timing (Server-Timing header) and the slow-query log
+SQL_INSTRUMENTATION = True
+SLOW_QUERY_MS = 100
+
+# Register Flask-Migrate (the `flask db` commands). wsgi.py turns it off so the
+# web workers never import alembic.
+MIGRATE = True
@@ -0,0 +1,45 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import datetime, timezone
+from functools import lru_cache
+
+#----------------------------------------------------------------------------#
+# Filters.
+#----------------------------------------------------------------------------#
+
+# babel and dateutil are imported on the first render rather than at startup;
+# app.preload() warms them up before the workers fork.
+
+DATETIME_PATTERNS = {
+  'full': "EEEE MMMM, d, y 'at' h:mma",
+  'medium': "EE MM, dd, y h:mma"
+}
+
+@lru_cache(maxsize=None)
+def datetime_locale():
+  import babel
+  from babel.dates import LC_TIME
+  return babel.Locale.parse(LC_TIME or 'en_US_POSIX')
+
+@lru_cache(maxsize=64)
+def datetime_pattern(format):
+  from babel.dates import parse_pattern
+  return parse_pattern(DATETIME_PATTERNS.get(format, format))
+
+# show tiles repeat the same handful of start times on every render. Equal
+# instants share an entry whatever their offset, which is safe as they are
+# all shown in UTC, the zone start times are stored in.
+@lru_cache(maxsize=4096)
+def format_datetime(value, format='medium'):
+  # start_time is stored as a timestamp, only fall back to parsing for strings
+  if isinstance(value, datetime):
+    date = value
+  else:
+    import dateutil.parser
+    date = dateutil.parser.parse(value)
+  # naive times are UTC, as babel.dates.format_datetime takes them to be
+  if date.tzinfo is None:
+    date = date.replace(tzinfo=timezone.utc)
+  return datetime_pattern(format).apply(date.astimezone(timezone.utc), datetime_locale())
@@ -1,7 +1,8 @@
 from datetime import datetime
 from flask_wtf import Form
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField
-from wtforms.validators import DataRequired, AnyOf, URL
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, IntegerField, TextAreaField
+from wtforms.validators import DataRequired, URL, NumberRange
+from models import DEFAULT_SHOW_DURATION, MAX_SHOW_DURATION
 
 class ShowForm(Form):
     artist_id = StringField(
@@ -15,6 +16,19 @@ class ShowForm(Form):
         validators=[DataRequired()],
         default= datetime.today()
     )
+    duration = IntegerField(
+        'duration',
+        validators=[NumberRange(min=1, max=MAX_SHOW_DURATION)],
+        default=DEFAULT_SHOW_DURATION
+    )
+    # repeats from start_time, an RFC 5545 rule such as FREQ=WEEKLY;COUNT=12
+    recurrence = StringField(
+        'recurrence'
+    )
+    # more start times, one per line
+    dates = TextAreaField(
+        'dates'
+    )
 
 class VenueForm(Form):
     name = StringField(
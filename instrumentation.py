@@ -0,0 +1,112 @@
+import heapq
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# slowest statements kept per request
+SLOWEST = 3
+# longest parameter repr written to the slow-query log
+MAX_PARAMETERS_LENGTH = 500
+# longest statement text sent in a Server-Timing description
+MAX_DESCRIPTION_LENGTH = 80
+
+
+class RequestSQLStats(object):
+    __slots__ = ('statements', 'duration', 'slowest')
+
+    def __init__(self):
+        self.statements = 0
+        self.duration = 0.0
+        self.slowest = []  # min-heap of (seconds, statement)
+
+    def record(self, statement, elapsed):
+        self.statements += 1
+        self.duration += elapsed
+        if len(self.slowest) < SLOWEST:
+            heapq.heappush(self.slowest, (elapsed, statement))
+        elif elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (elapsed, statement))
+
+    def server_timing(self, total):
+        '''Server-Timing entries: the statement count and DB time, the
+        slowest statements as sql1, sql2, ... and the total time.'''
+        entries = ['db;desc="%d statements";dur=%.2f' % (self.statements, self.duration * 1000)]
+        for i, (elapsed, statement) in enumerate(sorted(self.slowest, reverse=True), 1):
+            entries.append('sql%d;dur=%.2f;desc="%s"' % (i, elapsed * 1000, _description(statement)))
+        entries.append('total;dur=%.2f' % total)
+        return ', '.join(entries)
+
+
+def _description(statement):
+    # one line, trimmed, and safe inside a quoted-string
+    text = ' '.join(statement.split())
+    if len(text) > MAX_DESCRIPTION_LENGTH:
+        text = text[:MAX_DESCRIPTION_LENGTH - 3] + '...'
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def sql_stats():
+    '''SQL statistics of the current request, or None outside a request.'''
+    return g.get('sql_stats') if has_request_context() else None
+
+
+def start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append((id(context), time.perf_counter()))
+
+
+def stop_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()[1]
+    if not has_request_context():
+        return
+    stats = g.get('sql_stats')
+    if stats is None:
+        return
+    stats.record(statement, elapsed)
+    if elapsed * 1000 >= current_app.config.get('SLOW_QUERY_MS', 100):
+        current_app.logger.warning('slow query %.1fms in %s %s: %s parameters=%s',
+                                   elapsed * 1000, request.method, request.path,
+                                   ' '.join(statement.split()),
+                                   repr(parameters)[:MAX_PARAMETERS_LENGTH])
+
+
+def drop_timer(exception_context):
+    # a failed statement never reaches stop_timer; drop its start so the
+    # pooled connection does not hand it to the next statement. Errors raised
+    # before the cursor ran have no start of their own to drop.
+    starts = exception_context.connection.info.get('query_start') if exception_context.connection else None
+    context = exception_context.execution_context
+    if starts and context is not None and starts[-1][0] == id(context):
+        starts.pop()
+
+
+def init_app(app):
+    '''Time every SQL statement, per request, on every engine.
+
+    Each response gets a Server-Timing header with the statement count, DB
+    time, the SLOWEST statements and total time. Statements slower than SLOW_QUERY_MS are logged
+    through app.logger with the route and parameters.
+    '''
+    if not app.config.get('SQL_INSTRUMENTATION', True):
+        return
+
+    # the engine hooks are process-wide, install them once for every app
+    if not event.contains(Engine, 'before_cursor_execute', start_timer):
+        event.listen(Engine, 'before_cursor_execute', start_timer)
+        event.listen(Engine, 'after_cursor_execute', stop_timer)
+        event.listen(Engine, 'handle_error', drop_timer)
+
+    @app.before_request
+    def start_request_stats():
+        g.request_started = time.perf_counter()
+        g.sql_stats = RequestSQLStats()
+
+    @app.after_request
+    def add_server_timing(response):
+        stats = sql_stats()
+        if stats is not None:
+            total = (time.perf_counter() - g.request_started) * 1000
+            response.headers.add('Server-Timing', stats.server_timing(total))
+        return response
@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+from flask import before_render_template, template_rendered
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RENDER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _merge(totals, shard):
+    # add the counters and histograms of `shard` into `totals`
+    for key, value in list(shard.items()):
+        if isinstance(value, list):
+            total = totals.setdefault(key, [0] * len(value))
+            for i, part in enumerate(value):
+                total[i] += part
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+class Registry(object):
+    '''Counters and histograms sharded per thread.
+
+    Every thread only ever writes to its own shard, so recording takes no
+    lock and loses no updates under a threaded server; the lock is only
+    taken when a thread first records and when the shards are summed.
+    Shards of threads that have exited are folded into one, so a
+    thread-per-request server does not pile them up.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shards = []   # (thread, shard) of the threads that recorded
+        self._retired = {}  # the summed shards of exited threads
+        self._local = threading.local()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire(self):
+        # called with the lock held
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                _merge(self._retired, shard)
+        self._shards = live
+
+    def inc(self, name, labels=(), amount=1):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def observe(self, name, labels, value, buckets):
+        shard = self._shard()
+        key = (name, labels)
+        histogram = shard.get(key)
+        if histogram is None:
+            # per-bucket counts (the last one is +Inf) followed by the sum
+            histogram = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+        histogram[bisect.bisect_left(buckets, value)] += 1
+        histogram[-1] += value
+
+    def collect(self):
+        # {(name, labels): value or [bucket counts..., sum]} summed over threads
+        totals = {}
+        with self._lock:
+            self._retire()
+            _merge(totals, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            _merge(totals, shard)
+        return totals
+
+
+def _labels(pairs):
+    return '{%s}' % ','.join('%s="%s"' % (name, str(value).replace('"', '\\"')) for name, value in pairs) if pairs else ''
+
+
+def _histogram_lines(name, labels, values, buckets):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets + ('+Inf',), values[:-1]):
+        cumulative += count
+        lines.append('%s_bucket%s %d' % (name, _labels(labels + (('le', bound),)), cumulative))
+    lines.append('%s_sum%s %.6f' % (name, _labels(labels), values[-1]))
+    lines.append('%s_count%s %d' % (name, _labels(labels), cumulative))
+    return lines
+
+
+def init_app(app, db, page_cache=None):
+    '''Record request, template and pool metrics and serve them at /metrics.'''
+    registry = Registry()
+    app.extensions['metrics'] = registry
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_started = time.perf_counter()
+        registry.inc('requests_started')
+
+    @app.after_request
+    def record_request(response):
+        if 'metrics_started' in g:
+            labels = (('endpoint', request.endpoint or 'unmatched'), ('status', response.status_code))
+            registry.observe('fyyur_http_request_duration_seconds', labels,
+                             time.perf_counter() - g.metrics_started, LATENCY_BUCKETS)
+        return response
+
+    @app.teardown_request
+    def finish_metrics(exc):
+        if 'metrics_started' in g:
+            registry.inc('requests_finished')
+
+    def start_render(sender, template, context, **extra):
+        g.setdefault('render_started', []).append(time.perf_counter())
+
+    def finish_render(sender, template, context, **extra):
+        started = g.get('render_started')
+        if started:
+            registry.observe('fyyur_template_render_seconds', (('template', template.name),),
+                             time.perf_counter() - started.pop(), RENDER_BUCKETS)
+
+    # template signals need blinker (see requirements.txt), Flask < 2.3 raises without it
+    before_render_template.connect(start_render, app, weak=False)
+    template_rendered.connect(finish_render, app, weak=False)
+
+    def pool_lines():
+        binds = [None] + list(app.config.get('SQLALCHEMY_BINDS') or {})
+        pools = [(bind or 'default', db.get_engine(app, bind=bind).pool) for bind in binds]
+        lines = []
+        for metric, method, description in (
+                ('checked_out', 'checkedout', 'Connections checked out of the SQLAlchemy pool.'),
+                ('overflow', 'overflow', 'Connections open beyond the pool size.'),
+                ('size', 'size', 'Configured SQLAlchemy pool size.')):
+            lines += ['# HELP fyyur_db_pool_%s %s' % (metric, description), '# TYPE fyyur_db_pool_%s gauge' % metric]
+            for bind, pool in pools:
+                # SQLite's pools do not track checkouts
+                if hasattr(pool, method):
+                    lines.append('fyyur_db_pool_%s%s %d' % (metric, _labels((('bind', bind),)), getattr(pool, method)()))
+        return lines
+
+    @app.route('/metrics')
+    def metrics():
+        totals = registry.collect()
+        lines = [
+            '# HELP fyyur_http_requests_in_flight Requests currently being served.',
+            '# TYPE fyyur_http_requests_in_flight gauge',
+            'fyyur_http_requests_in_flight %d' % (
+                totals.get(('requests_started', ()), 0) - totals.get(('requests_finished', ()), 0)),
+            '# HELP fyyur_http_requests_total Requests served, by endpoint and status.',
+            '# TYPE fyyur_http_requests_total counter',
+        ]
+        requests = sorted((key, value) for key, value in totals.items()
+                          if key[0] == 'fyyur_http_request_duration_seconds')
+        for (_, labels), values in requests:
+            lines.append('fyyur_http_requests_total%s %d' % (_labels(labels), sum(values[:-1])))
+
+        lines += ['# HELP fyyur_http_request_duration_seconds Request latency, by endpoint and status.',
+                  '# TYPE fyyur_http_request_duration_seconds histogram']
+        for (name, labels), values in requests:
+            lines += _histogram_lines(name, labels, values, LATENCY_BUCKETS)
+
+        lines += ['# HELP fyyur_template_render_seconds Template render time, by template.',
+                  '# TYPE fyyur_template_render_seconds histogram']
+        for (name, labels), values in sorted(totals.items()):
+            if name == 'fyyur_template_render_seconds':
+                lines += _histogram_lines(name, labels, values, RENDER_BUCKETS)
+
+        lines += pool_lines()
+
+        if page_cache is not None:
+            stats = page_cache.stats()
+            lines += ['# TYPE fyyur_page_cache_hits_total counter',
+                      'fyyur_page_cache_hits_total %d' % stats['hits'],
+                      '# TYPE fyyur_page_cache_misses_total counter',
+                      'fyyur_page_cache_misses_total %d' % stats['misses']]
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
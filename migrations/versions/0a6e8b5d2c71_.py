@@ -0,0 +1,30 @@
+"""updated_at columns on Venue, Artist and Show
+
+Revision ID: 0a6e8b5d2c71
+Revises: f19c7d3e4a80
+Create Date: 2026-10-18 14:41:36.082519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6e8b5d2c71'
+down_revision = 'f19c7d3e4a80'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist', 'Show')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True),
+                                       server_default=sa.func.now(), nullable=False))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,52 @@
+"""materialized upcoming/past show counters on Venue and Artist
+
+Revision ID: 1c9f4e7a3b52
+Revises: 0a6e8b5d2c71
+Create Date: 2026-10-18 16:05:12.417306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c9f4e7a3b52'
+down_revision = '0a6e8b5d2c71'
+branch_labels = None
+depends_on = None
+
+# (owner table, Show column referencing it)
+OWNERS = (
+    ('Venue', 'venue_id'),
+    ('Artist', 'artist_id'),
+)
+
+COUNT_SHOWS = '''
+UPDATE "{owner}" SET
+  upcoming_shows_count = (SELECT count(*) FROM "Show" WHERE "Show".{column} = "{owner}".id
+                          AND "Show".start_time >= (SELECT rolled_over_at FROM "ShowRollover")),
+  past_shows_count = (SELECT count(*) FROM "Show" WHERE "Show".{column} = "{owner}".id
+                      AND "Show".start_time < (SELECT rolled_over_at FROM "ShowRollover"))
+'''
+
+
+def upgrade():
+    op.create_table('ShowRollover',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rolled_over_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute('INSERT INTO "ShowRollover" (id) VALUES (1)')
+
+    for owner, column in OWNERS:
+        op.add_column(owner, sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(owner, sa.Column('past_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.execute(COUNT_SHOWS.format(owner=owner, column=column))
+
+
+def downgrade():
+    for owner, _ in OWNERS:
+        with op.batch_alter_table(owner) as batch_op:
+            batch_op.drop_column('past_shows_count')
+            batch_op.drop_column('upcoming_shows_count')
+    op.drop_table('ShowRollover')
@@ -0,0 +1,80 @@
+"""convert Show.start_time to an indexed timestamp
+
+Revision ID: 3b8d2f6c1a47
+Revises: 206025f68480
+Create Date: 2026-10-18 10:12:41.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from dateutil import parser, tz
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8d2f6c1a47'
+down_revision = '206025f68480'
+branch_labels = None
+depends_on = None
+
+# rows are converted in id order, this many at a time, so the backfill never
+# holds the whole Show table in memory or in a single UPDATE.
+BATCH_SIZE = 1000
+
+
+def _backfill(convert, old_type, new_type):
+    connection = op.get_bind()
+    show = sa.table(
+        'Show',
+        sa.column('id', sa.Integer),
+        sa.column('start_time', old_type),
+        sa.column('start_time_new', new_type),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select([show.c.id, show.c.start_time])
+            .where(show.c.id > last_id)
+            .order_by(show.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        connection.execute(
+            show.update()
+            .where(show.c.id == sa.bindparam('show_id'))
+            .values(start_time_new=sa.bindparam('converted')),
+            [{'show_id': row.id, 'converted': convert(row.start_time)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def _parse(value):
+    if not value:
+        return None
+    date = parser.parse(value)
+    # naive strings were entered through the show form, treat them as UTC
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=tz.tzutc())
+    return date
+
+
+def _format(value):
+    return value.isoformat(sep=' ') if value is not None else None
+
+
+def upgrade():
+    op.add_column('Show', sa.Column('start_time_new', sa.DateTime(timezone=True), nullable=True))
+    _backfill(_parse, sa.String(), sa.DateTime(timezone=True))
+    with op.batch_alter_table('Show') as batch_op:
+        batch_op.drop_column('start_time')
+        batch_op.alter_column('start_time_new', new_column_name='start_time')
+    op.create_index(op.f('ix_Show_start_time'), 'Show', ['start_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_Show_start_time'), table_name='Show')
+    op.add_column('Show', sa.Column('start_time_new', sa.String(length=200), nullable=True))
+    _backfill(_format, sa.DateTime(timezone=True), sa.String())
+    with op.batch_alter_table('Show') as batch_op:
+        batch_op.drop_column('start_time')
+        batch_op.alter_column('start_time_new', new_column_name='start_time')
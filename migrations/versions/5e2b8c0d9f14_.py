@@ -0,0 +1,131 @@
+"""Show.end_time and no overlapping shows per venue or artist
+
+Revision ID: 5e2b8c0d9f14
+Revises: 1c9f4e7a3b52
+Create Date: 2026-10-18 18:41:27.902154
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b8c0d9f14'
+down_revision = '1c9f4e7a3b52'
+branch_labels = None
+depends_on = None
+
+# existing shows get the default length of models.DEFAULT_SHOW_DURATION
+DEFAULT_SHOW_DURATION = timedelta(minutes=120)
+
+# rows are backfilled in id order, this many at a time, as in 3b8d2f6c1a47
+BATCH_SIZE = 1000
+
+# (Show column, constraint/trigger name), as in models.OVERLAP_CHECKED
+OVERLAP_CHECKED = (
+    ('venue_id', 'Show_no_venue_overlap'),
+    ('artist_id', 'Show_no_artist_overlap'),
+)
+
+# a show overlapping any other overlaps the next one of its owner
+OVERLAPPING = '''
+SELECT id, next_id FROM (
+  SELECT id, end_time,
+         lead(id) OVER (PARTITION BY {column} ORDER BY start_time, id) AS next_id,
+         lead(start_time) OVER (PARTITION BY {column} ORDER BY start_time, id) AS next_start
+  FROM "Show"
+) AS shows WHERE next_start < end_time LIMIT 10
+'''
+
+
+def _backfill():
+    connection = op.get_bind()
+    show = sa.table(
+        'Show',
+        sa.column('id', sa.Integer),
+        sa.column('start_time', sa.DateTime(timezone=True)),
+        sa.column('end_time', sa.DateTime(timezone=True)),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select([show.c.id, show.c.start_time])
+            .where(show.c.id > last_id)
+            .where(show.c.start_time.isnot(None))
+            .order_by(show.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        connection.execute(
+            show.update()
+            .where(show.c.id == sa.bindparam('show_id'))
+            .values(end_time=sa.bindparam('ends')),
+            [{'show_id': row.id, 'ends': row.start_time + DEFAULT_SHOW_DURATION} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def _check_start_times():
+    # 3b8d2f6c1a47 leaves shows whose start_time was empty without one;
+    # they cannot get an end_time, and start_time becomes NOT NULL too
+    ids = [row.id for row in op.get_bind().execute(
+        sa.text('SELECT id FROM "Show" WHERE start_time IS NULL ORDER BY id LIMIT 10'))]
+    if ids:
+        raise RuntimeError(
+            'these shows have no start_time, set or delete them before upgrading: %s'
+            % ', '.join(str(id) for id in ids))
+
+
+def _check_overlaps():
+    connection = op.get_bind()
+    for column, name in OVERLAP_CHECKED:
+        pairs = connection.execute(sa.text(OVERLAPPING.format(column=column))).fetchall()
+        if pairs:
+            raise RuntimeError(
+                '%s: these shows overlap, move or shorten them before upgrading: %s'
+                % (name, ', '.join('%d/%d' % tuple(pair) for pair in pairs)))
+
+
+def upgrade():
+    _check_start_times()
+    op.add_column('Show', sa.Column('end_time', sa.DateTime(timezone=True), nullable=True))
+    _backfill()
+    with op.batch_alter_table('Show') as batch_op:
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(timezone=True), nullable=False)
+        batch_op.alter_column('end_time', existing_type=sa.DateTime(timezone=True), nullable=False)
+        batch_op.create_check_constraint('ck_Show_duration', 'end_time > start_time')
+    _check_overlaps()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        for column, name in OVERLAP_CHECKED:
+            op.execute(f'ALTER TABLE "Show" ADD CONSTRAINT "{name}" EXCLUDE USING gist '
+                       f'({column} WITH =, tstzrange(start_time, end_time) WITH &&)')
+    elif op.get_bind().dialect.name == 'sqlite':
+        for column, name in OVERLAP_CHECKED:
+            for operation in ('insert', 'update'):
+                op.execute(
+                    f'CREATE TRIGGER "{name}_{operation}" BEFORE {operation.upper()} ON "Show" '
+                    f'WHEN (SELECT end_time FROM "Show" WHERE {column} = new.{column} '
+                    f'AND start_time < new.end_time AND id IS NOT new.id '
+                    f'ORDER BY start_time DESC LIMIT 1) > new.start_time '
+                    f'BEGIN SELECT RAISE(ABORT, \'{name}\'); END')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for _, name in OVERLAP_CHECKED:
+            op.execute(f'ALTER TABLE "Show" DROP CONSTRAINT "{name}"')
+    elif op.get_bind().dialect.name == 'sqlite':
+        for _, name in OVERLAP_CHECKED:
+            for operation in ('insert', 'update'):
+                op.execute(f'DROP TRIGGER "{name}_{operation}"')
+    with op.batch_alter_table('Show') as batch_op:
+        # SQLite's CHECK constraints are not reflected, the table copy drops it
+        if op.get_bind().dialect.name != 'sqlite':
+            batch_op.drop_constraint('ck_Show_duration', type_='check')
+        batch_op.drop_column('end_time')
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(timezone=True), nullable=True)
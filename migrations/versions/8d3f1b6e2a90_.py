@@ -0,0 +1,57 @@
+"""shows last at most a day
+
+Revision ID: 8d3f1b6e2a90
+Revises: 5e2b8c0d9f14
+Create Date: 2026-10-19 09:12:03.551208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3f1b6e2a90'
+down_revision = '5e2b8c0d9f14'
+branch_labels = None
+depends_on = None
+
+# models.MAX_SHOW_DURATION, in minutes
+MAX_SHOW_DURATION = 24 * 60
+
+# shows lasting longer, by dialect
+TOO_LONG = {
+    'postgresql': f"end_time > start_time + interval '{MAX_SHOW_DURATION} minutes'",
+    'sqlite': f"strftime('%s', end_time) - strftime('%s', start_time) > {MAX_SHOW_DURATION * 60}",
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect not in TOO_LONG:
+        return
+    ids = [row.id for row in op.get_bind().execute(
+        sa.text(f'SELECT id FROM "Show" WHERE {TOO_LONG[dialect]} ORDER BY id LIMIT 10'))]
+    if ids:
+        raise RuntimeError(
+            'these shows last longer than %d minutes, shorten them before upgrading: %s'
+            % (MAX_SHOW_DURATION, ', '.join(str(id) for id in ids)))
+
+    # the same DDL as models.MAX_DURATION_DDL
+    if dialect == 'postgresql':
+        op.execute(f'ALTER TABLE "Show" ADD CONSTRAINT "ck_Show_max_duration" '
+                   f'CHECK (end_time <= start_time + interval \'{MAX_SHOW_DURATION} minutes\')')
+    else:
+        for operation in ('insert', 'update'):
+            op.execute(
+                f'CREATE TRIGGER "ck_Show_max_duration_{operation}" BEFORE {operation.upper()} ON "Show" '
+                f'WHEN strftime(\'%s\', new.end_time) - strftime(\'%s\', new.start_time) > {MAX_SHOW_DURATION * 60} '
+                f'BEGIN SELECT RAISE(ABORT, \'ck_Show_max_duration\'); END')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('ALTER TABLE "Show" DROP CONSTRAINT "ck_Show_max_duration"')
+    elif dialect == 'sqlite':
+        for operation in ('insert', 'update'):
+            op.execute(f'DROP TRIGGER "ck_Show_max_duration_{operation}"')
@@ -0,0 +1,29 @@
+"""revision counters on Venue, Artist and Show
+
+Revision ID: b7e4c2a9d5f3
+Revises: 8d3f1b6e2a90
+Create Date: 2026-10-18 21:12:05.417390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4c2a9d5f3'
+down_revision = '8d3f1b6e2a90'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist', 'Show')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('revision')
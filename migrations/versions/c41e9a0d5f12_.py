@@ -0,0 +1,26 @@
+"""composite indexes on Show for per-venue and per-artist time lookups
+
+Revision ID: c41e9a0d5f12
+Revises: 3b8d2f6c1a47
+Create Date: 2026-10-18 11:03:27.641090
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e9a0d5f12'
+down_revision = '3b8d2f6c1a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_Show_venue_id_start_time', 'Show', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_Show_artist_id_start_time', 'Show', ['artist_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_Show_artist_id_start_time', table_name='Show')
+    op.drop_index('ix_Show_venue_id_start_time', table_name='Show')
@@ -0,0 +1,50 @@
+"""name search indexes on Venue and Artist
+
+Revision ID: d7a2c3e98b04
+Revises: c41e9a0d5f12
+Create Date: 2026-10-18 11:48:02.915733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2c3e98b04'
+down_revision = 'c41e9a0d5f12'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table in TABLES:
+            op.execute(f'CREATE INDEX "ix_{table}_name_trgm" ON "{table}" USING gin (lower(name) gin_trgm_ops)')
+    elif dialect == 'sqlite':
+        for table in TABLES:
+            op.execute(f'CREATE VIRTUAL TABLE "{table}_fts" USING fts5(name, content=\'{table}\', content_rowid=\'id\', tokenize=\'trigram\')')
+            op.execute(f'CREATE TRIGGER "{table}_fts_ai" AFTER INSERT ON "{table}" BEGIN '
+                       f'INSERT INTO "{table}_fts"(rowid, name) VALUES (new.id, new.name); END')
+            op.execute(f'CREATE TRIGGER "{table}_fts_ad" AFTER DELETE ON "{table}" BEGIN '
+                       f'INSERT INTO "{table}_fts"("{table}_fts", rowid, name) VALUES (\'delete\', old.id, old.name); END')
+            op.execute(f'CREATE TRIGGER "{table}_fts_au" AFTER UPDATE OF name ON "{table}" BEGIN '
+                       f'INSERT INTO "{table}_fts"("{table}_fts", rowid, name) VALUES (\'delete\', old.id, old.name); '
+                       f'INSERT INTO "{table}_fts"(rowid, name) VALUES (new.id, new.name); END')
+            # index the rows that already exist
+            op.execute(f'INSERT INTO "{table}_fts"("{table}_fts") VALUES (\'rebuild\')')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table in TABLES:
+            op.execute(f'DROP INDEX "ix_{table}_name_trgm"')
+    elif dialect == 'sqlite':
+        for table in TABLES:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER "{table}_fts_{suffix}"')
+            op.execute(f'DROP TABLE "{table}_fts"')
@@ -0,0 +1,124 @@
+"""normalize Venue/Artist genres into Genre and association tables
+
+Revision ID: e5f0b6a27c39
+Revises: d7a2c3e98b04
+Create Date: 2026-10-18 13:20:55.104422
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f0b6a27c39'
+down_revision = 'd7a2c3e98b04'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# (owner table, association table, owner id column)
+OWNERS = (
+    ('Venue', 'venue_genres', 'venue_id'),
+    ('Artist', 'artist_genres', 'artist_id'),
+)
+
+genre_table = sa.table('Genre', sa.column('id', sa.Integer), sa.column('name', sa.String))
+
+
+def _owner_table(name):
+    return sa.table(name, sa.column('id', sa.Integer), sa.column('genres', sa.String))
+
+
+def _association_table(name, owner_column):
+    return sa.table(name, sa.column(owner_column, sa.Integer), sa.column('genre_id', sa.Integer))
+
+
+def _batches(connection, query, key):
+    last_id = 0
+    while True:
+        rows = connection.execute(query.where(key > last_id).order_by(key).limit(BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    op.create_table('Genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    for owner, association, owner_column in OWNERS:
+        op.create_table(association,
+        sa.Column(owner_column, sa.Integer(), nullable=False),
+        sa.Column('genre_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint([owner_column], [owner + '.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['genre_id'], ['Genre.id'], ),
+        sa.PrimaryKeyConstraint(owner_column, 'genre_id')
+        )
+        op.create_index('ix_%s_genre_id' % association, association, ['genre_id', owner_column], unique=False)
+
+    connection = op.get_bind()
+    genre_ids = {}
+    for owner, association, owner_column in OWNERS:
+        owner_table = _owner_table(owner)
+        association_table = _association_table(association, owner_column)
+        query = sa.select([owner_table.c.id, owner_table.c.genres])
+        for rows in _batches(connection, query, owner_table.c.id):
+            pairs = set()
+            for owner_id, genres in rows:
+                for name in (genres or '').split(','):
+                    name = name.strip()
+                    if name:
+                        pairs.add((owner_id, name))
+
+            missing = {name for _, name in pairs} - genre_ids.keys()
+            if missing:
+                connection.execute(genre_table.insert(), [{'name': name} for name in missing])
+                genre_ids.update(connection.execute(
+                    sa.select([genre_table.c.name, genre_table.c.id]).where(genre_table.c.name.in_(missing))
+                ).fetchall())
+            if pairs:
+                connection.execute(association_table.insert(), [
+                    {owner_column: owner_id, 'genre_id': genre_ids[name]} for owner_id, name in pairs
+                ])
+
+    for owner, _, _ in OWNERS:
+        with op.batch_alter_table(owner) as batch_op:
+            batch_op.drop_column('genres')
+
+
+def downgrade():
+    for owner, _, _ in OWNERS:
+        op.add_column(owner, sa.Column('genres', sa.String(length=120), nullable=True))
+
+    connection = op.get_bind()
+    for owner, association, owner_column in OWNERS:
+        owner_table = _owner_table(owner)
+        association_table = _association_table(association, owner_column)
+        query = sa.select([owner_table.c.id])
+        for rows in _batches(connection, query, owner_table.c.id):
+            ids = [row[0] for row in rows]
+            genres = {}
+            for owner_id, name in connection.execute(
+                sa.select([association_table.c[owner_column], genre_table.c.name])
+                .select_from(association_table.join(genre_table, genre_table.c.id == association_table.c.genre_id))
+                .where(association_table.c[owner_column].in_(ids))
+                .order_by(genre_table.c.name)
+            ):
+                genres.setdefault(owner_id, []).append(name)
+            if genres:
+                connection.execute(
+                    owner_table.update()
+                    .where(owner_table.c.id == sa.bindparam('owner_id'))
+                    .values(genres=sa.bindparam('joined')),
+                    [{'owner_id': owner_id, 'joined': ','.join(names)} for owner_id, names in genres.items()]
+                )
+
+    for _, association, _ in OWNERS:
+        op.drop_index('ix_%s_genre_id' % association, table_name=association)
+        op.drop_table(association)
+    op.drop_table('Genre')
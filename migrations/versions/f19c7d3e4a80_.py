@@ -0,0 +1,47 @@
+"""drop the denormalized venue/artist name and image columns from Show
+
+Revision ID: f19c7d3e4a80
+Revises: e5f0b6a27c39
+Create Date: 2026-10-18 14:02:13.577960
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19c7d3e4a80'
+down_revision = 'e5f0b6a27c39'
+branch_labels = None
+depends_on = None
+
+# (Show column, owner table, owner column, owner id column on Show, length)
+COPIED_COLUMNS = (
+    ('venue_name', 'Venue', 'name', 'venue_id', 120),
+    ('artist_name', 'Artist', 'name', 'artist_id', 120),
+    ('venue_image_link', 'Venue', 'image_link', 'venue_id', 500),
+    ('artist_image_link', 'Artist', 'image_link', 'artist_id', 500),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('Show') as batch_op:
+        for column, _, _, _, _ in COPIED_COLUMNS:
+            batch_op.drop_constraint('Show_%s_fkey' % column, type_='foreignkey')
+            batch_op.drop_column(column)
+
+
+def downgrade():
+    with op.batch_alter_table('Show') as batch_op:
+        for column, _, _, _, length in COPIED_COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.String(length=length), nullable=True))
+
+    for column, owner, owner_column, owner_id, _ in COPIED_COLUMNS:
+        op.execute(
+            f'UPDATE "Show" SET {column} = '
+            f'(SELECT "{owner}".{owner_column} FROM "{owner}" WHERE "{owner}".id = "Show".{owner_id})'
+        )
+
+    with op.batch_alter_table('Show') as batch_op:
+        for column, owner, owner_column, _, _ in COPIED_COLUMNS:
+            batch_op.create_foreign_key('Show_%s_fkey' % column, owner, [column], [owner_column])
@@ -0,0 +1,228 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from sqlalchemy import func, event, DDL
+from replicas import RoutingSQLAlchemy
+
+# bound to the application in app.create_app()
+db = RoutingSQLAlchemy()
+
+# every UPDATE of a Venue, Artist or Show row bumps its revision along with
+# updated_at, whose one-second resolution on SQLite cannot tell two writes
+# of the same second apart
+REVISION_BUMP = db.text('revision + 1')
+
+#----------------------------------------------------------------------------#
+# Models.
+#----------------------------------------------------------------------------#
+
+class Genre(db.Model):
+    __tablename__ = 'Genre'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), unique=True, nullable=False)
+
+
+venue_genres = db.Table('venue_genres',
+    db.Column('venue_id', db.Integer, db.ForeignKey('Venue.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id'), primary_key=True),
+    # the primary key serves venue -> genres, this serves genre -> venues
+    db.Index('ix_venue_genres_genre_id', 'genre_id', 'venue_id'),
+)
+
+artist_genres = db.Table('artist_genres',
+    db.Column('artist_id', db.Integer, db.ForeignKey('Artist.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id'), primary_key=True),
+    db.Index('ix_artist_genres_genre_id', 'genre_id', 'artist_id'),
+)
+
+
+class Venue(db.Model):
+    __tablename__ = 'Venue'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), unique=True)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(500), unique=True)
+    facebook_link = db.Column(db.String(120))
+    genres = db.relationship('Genre', secondary=venue_genres, order_by=Genre.name)
+    shows = db.relationship('Show', backref='venue', lazy=True)
+    # maintained by queries.count_shows() and `flask fyyur rollover`
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, server_default='0')
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    revision = db.Column(db.Integer, nullable=False, server_default='0', onupdate=REVISION_BUMP)
+
+    @property
+    def genre_names(self):
+      return [genre.name for genre in self.genres]
+
+
+#     {
+#     "city": "San Francisco",
+#     "state": "CA",
+#     "venues": [{
+#       "id": 1,
+#       "name": "The Musical Hop",
+#       "num_upcoming_shows": 0,
+#     }, {
+#       "id": 3,
+#       "name": "Park Square Live Music & Coffee",
+#       "num_upcoming_shows": 1,
+#     }]
+#   }
+
+    # TODO implement any missing fields, as a database migration using Flask-Migrate
+
+class Artist(db.Model):
+    __tablename__ = 'Artist'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), unique=True)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.relationship('Genre', secondary=artist_genres, order_by=Genre.name)
+    image_link = db.Column(db.String(500), unique=True)
+    facebook_link = db.Column(db.String(120))
+    website = db.Column(db.String(120))
+    seeking_venue = db.Column(db.Boolean)
+    seeking_description = db.Column(db.String(200))
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, server_default='0')
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    revision = db.Column(db.Integer, nullable=False, server_default='0', onupdate=REVISION_BUMP)
+    # create a relationship between an artist and their show(s)
+    shows = db.relationship('Show', backref='artist', lazy=True)
+
+    @property
+    def genre_names(self):
+      return [genre.name for genre in self.genres]
+    
+    def __repr__(self):
+      return f'''<Artist id({self.id})
+       name: {self.name},
+       city:{self.city}
+       >'''
+
+
+# length of a show when none is given, and the longest one, in minutes
+DEFAULT_SHOW_DURATION = 120
+MAX_SHOW_DURATION = 24 * 60
+
+
+class Show(db.Model):
+    __tablename__ = 'Show'
+
+    id = db.Column(db.Integer, primary_key=True)
+    venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+    artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id'), nullable=False)
+    start_time = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
+    # the show occupies its venue and artist over [start_time, end_time)
+    end_time = db.Column(db.DateTime(timezone=True), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    revision = db.Column(db.Integer, nullable=False, server_default='0', onupdate=REVISION_BUMP)
+
+    # the venue and artist pages look shows up by owner, then by time
+    __table_args__ = (
+        db.Index('ix_Show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_Show_artist_id_start_time', 'artist_id', 'start_time'),
+        db.CheckConstraint('end_time > start_time', name='ck_Show_duration'),
+    )
+
+
+
+    # TODO implement any missing fields, as a database migration using Flask-Migrate
+
+
+class ShowRollover(db.Model):
+    # a single row. Shows starting before rolled_over_at are counted as past
+    # by the Venue/Artist counters, later ones as upcoming.
+    __tablename__ = 'ShowRollover'
+
+    id = db.Column(db.Integer, primary_key=True)
+    rolled_over_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+event.listen(ShowRollover.__table__, 'after_create', DDL('INSERT INTO "ShowRollover" (id) VALUES (1)'))
+
+# TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
+
+# Name search indexes. Postgres gets a trigram GIN index on lower(name), which
+# serves the case-insensitive substring filter directly. SQLite gets an FTS5
+# table with the trigram tokenizer, kept in sync with triggers. The same DDL
+# is issued by migration d7a2c3e98b04 for existing databases.
+
+def _name_search_ddl(table):
+  return [
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'),
+    DDL(f'CREATE INDEX "ix_{table}_name_trgm" ON "{table}" USING gin (lower(name) gin_trgm_ops)').execute_if(dialect='postgresql'),
+    DDL(f'CREATE VIRTUAL TABLE "{table}_fts" USING fts5(name, content=\'{table}\', content_rowid=\'id\', tokenize=\'trigram\')').execute_if(dialect='sqlite'),
+    DDL(f'CREATE TRIGGER "{table}_fts_ai" AFTER INSERT ON "{table}" BEGIN '
+        f'INSERT INTO "{table}_fts"(rowid, name) VALUES (new.id, new.name); END').execute_if(dialect='sqlite'),
+    DDL(f'CREATE TRIGGER "{table}_fts_ad" AFTER DELETE ON "{table}" BEGIN '
+        f'INSERT INTO "{table}_fts"("{table}_fts", rowid, name) VALUES (\'delete\', old.id, old.name); END').execute_if(dialect='sqlite'),
+    DDL(f'CREATE TRIGGER "{table}_fts_au" AFTER UPDATE OF name ON "{table}" BEGIN '
+        f'INSERT INTO "{table}_fts"("{table}_fts", rowid, name) VALUES (\'delete\', old.id, old.name); '
+        f'INSERT INTO "{table}_fts"(rowid, name) VALUES (new.id, new.name); END').execute_if(dialect='sqlite'),
+  ]
+
+for model in (Venue, Artist):
+  for ddl in _name_search_ddl(model.__tablename__):
+    event.listen(model.__table__, 'after_create', ddl)
+  # the FTS table is not part of the metadata, drop_all() would leave it behind
+  event.listen(model.__table__, 'before_drop',
+    DDL(f'DROP TABLE IF EXISTS "{model.__tablename__}_fts"').execute_if(dialect='sqlite'))
+
+# No double bookings. Postgres enforces it with a GiST exclusion constraint
+# per owner. On SQLite a trigger looks up the owner's last show starting
+# before the new one ends (a single seek on the owner/start_time index) and
+# aborts if it ends after the new one starts. As existing shows never
+# overlap, no earlier show can. Issued by migration 5e2b8c0d9f14 as well.
+
+def _no_overlap_ddl(owner_column, name):
+  predecessor_ends_late = (
+    f'(SELECT end_time FROM "Show" WHERE {owner_column} = new.{owner_column} '
+    f'AND start_time < new.end_time AND id IS NOT new.id '
+    f'ORDER BY start_time DESC LIMIT 1) > new.start_time')
+  return [
+    DDL(f'ALTER TABLE "Show" ADD CONSTRAINT "{name}" EXCLUDE USING gist '
+        f'({owner_column} WITH =, tstzrange(start_time, end_time) WITH &&)').execute_if(dialect='postgresql'),
+  ] + [
+    DDL(f'CREATE TRIGGER "{name}_{operation}" BEFORE {operation.upper()} ON "Show" '
+        f'WHEN {predecessor_ends_late} '
+        f'BEGIN SELECT RAISE(ABORT, \'{name}\'); END').execute_if(dialect='sqlite')
+    for operation in ('insert', 'update')
+  ]
+
+# (Show column, constraint/trigger name)
+OVERLAP_CHECKED = (('venue_id', 'Show_no_venue_overlap'), ('artist_id', 'Show_no_artist_overlap'))
+
+event.listen(Show.__table__, 'after_create',
+  DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(dialect='postgresql'))
+for owner_column, name in OVERLAP_CHECKED:
+  for ddl in _no_overlap_ddl(owner_column, name):
+    event.listen(Show.__table__, 'after_create', ddl)
+
+# No show lasts longer than MAX_SHOW_DURATION, so any show overlapping a time
+# starts at most that long before it, which bounds the scans of
+# queries.book_shows(). A CHECK on Postgres, triggers on SQLite (which cannot
+# add a constraint to an existing table). Issued by migration 8d3f1b6e2a90 as well.
+
+MAX_DURATION_DDL = [
+  DDL(f'ALTER TABLE "Show" ADD CONSTRAINT "ck_Show_max_duration" '
+      f'CHECK (end_time <= start_time + interval \'{MAX_SHOW_DURATION} minutes\')').execute_if(dialect='postgresql'),
+] + [
+  # DDL formats its statement with %, hence the doubled %% of strftime
+  DDL(f'CREATE TRIGGER "ck_Show_max_duration_{operation}" BEFORE {operation.upper()} ON "Show" '
+      f'WHEN strftime(\'%%s\', new.end_time) - strftime(\'%%s\', new.start_time) > {MAX_SHOW_DURATION * 60} '
+      f'BEGIN SELECT RAISE(ABORT, \'ck_Show_max_duration\'); END').execute_if(dialect='sqlite')
+  for operation in ('insert', 'update')
+]
+
+for ddl in MAX_DURATION_DDL:
+  event.listen(Show.__table__, 'after_create', ddl)
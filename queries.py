@@ -0,0 +1,405 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import bisect
+import csv
+import io
+import json
+import hashlib
+try:
+  import orjson
+except ImportError:
+  orjson = None
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from flask import current_app, request, Response, abort, session, make_response, url_for
+from sqlalchemy import func, or_, tuple_, text
+from cache import current_cache
+from replicas import reading_own_writes
+from models import db, Genre, Venue, Artist, Show, ShowRollover, DEFAULT_SHOW_DURATION, MAX_SHOW_DURATION
+
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+def genre_ids(names):
+  # {name: id} of the named genres, creating the missing ones in a single insert
+  names = set(names)
+  ids = dict(db.session.query(Genre.name, Genre.id).filter(Genre.name.in_(names)))
+  missing = names - ids.keys()
+  if missing:
+    db.session.execute(Genre.__table__.insert(), [{"name": name} for name in missing])
+    ids.update(db.session.query(Genre.name, Genre.id).filter(Genre.name.in_(missing)))
+  return ids
+
+def write_genres(association, owner_column, owner_id, names):
+  # replace the owner's genre rows with one delete and one multi-row insert
+  db.session.execute(association.delete().where(association.c[owner_column] == owner_id))
+  ids = genre_ids(names).values()
+  if ids:
+    db.session.execute(association.insert(), [
+      {owner_column: owner_id, "genre_id": genre_id} for genre_id in ids
+    ])
+
+def search_by_name(model, search_term):
+  # case-insensitive substring search on name, best matches first.
+  limit = current_app.config['SEARCH_RESULT_LIMIT']
+  dialect = db.session.get_bind().dialect.name
+  search_term = search_term.lower()
+
+  # the FTS5 trigram tokenizer only indexes terms of three or more characters
+  if dialect == 'sqlite' and len(search_term) >= 3:
+    table = model.__tablename__
+    ids = [row.rowid for row in db.session.execute(
+      text(f'SELECT rowid FROM "{table}_fts" WHERE "{table}_fts" MATCH :term ORDER BY rank LIMIT :limit'),
+      {'term': '"%s"' % search_term.replace('"', '""'), 'limit': limit})]
+    found = {result.id: result for result in model.query.filter(model.id.in_(ids))}
+    return [found[result_id] for result_id in ids if result_id in found]
+
+  query = model.query.filter(func.lower(model.name).contains(search_term, autoescape=True))
+  if dialect == 'postgresql':
+    query = query.order_by(func.similarity(func.lower(model.name), search_term).desc(), model.id)
+  else:
+    query = query.order_by(model.name)
+  return query.limit(limit).all()
+
+def rolled_over_at():
+  # the ShowRollover watermark, as a scalar subquery
+  return db.session.query(ShowRollover.rolled_over_at).as_scalar()
+
+def venue_shows_query(venue_id):
+  # every show at the venue with its artist, flagged as past or upcoming.
+  # shows are past once `flask fyyur rollover` has passed their start time,
+  # so the lists agree with the venue's counters.
+  return db.session.query(
+      Show.artist_id, Artist.name.label('artist_name'),
+      Artist.image_link.label('artist_image_link'), Show.start_time,
+      (Show.start_time < rolled_over_at()).label('is_past')
+    ).join(Artist, Artist.id == Show.artist_id) \
+    .filter(Show.venue_id == venue_id) \
+    .order_by(Show.start_time)
+
+def artist_shows_query(artist_id):
+  # every show of the artist with its venue, flagged as past or upcoming.
+  return db.session.query(
+      Show.venue_id, Venue.name.label('venue_name'),
+      Venue.image_link.label('venue_image_link'), Show.start_time,
+      (Show.start_time < rolled_over_at()).label('is_past')
+    ).join(Venue, Venue.id == Show.venue_id) \
+    .filter(Show.artist_id == artist_id) \
+    .order_by(Show.start_time)
+
+def filter_shows(query, start=None, end=None, venue_id=None, artist_id=None):
+  # shows starting in [start, end), of one venue and/or artist. With an owner
+  # this is a range scan of its (owner, start_time) index, else of start_time.
+  if start is not None:
+    query = query.filter(Show.start_time >= start)
+  if end is not None:
+    query = query.filter(Show.start_time < end)
+  if venue_id is not None:
+    query = query.filter(Show.venue_id == venue_id)
+  if artist_id is not None:
+    query = query.filter(Show.artist_id == artist_id)
+  return query
+
+def show_filters():
+  # filter_shows() arguments from ?from=&to=&venue_id=&artist_id=, 400 on a bad date
+  import dateutil.parser
+  try:
+    start = _utc(dateutil.parser.parse(request.args['from'])) if request.args.get('from') else None
+    end = _utc(dateutil.parser.parse(request.args['to'])) if request.args.get('to') else None
+  except (ValueError, OverflowError):
+    abort(400)
+  return start, end, request.args.get('venue_id', type=int), request.args.get('artist_id', type=int)
+
+# one booking expands to at most this many shows
+MAX_OCCURRENCES = 1000
+
+def _utc(value):
+  # times are stored and compared in UTC; naive ones were entered as UTC,
+  # as migration 3b8d2f6c1a47 assumes
+  return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def show_duration(minutes):
+  # the timedelta of a show lasting `minutes`, DEFAULT_SHOW_DURATION if empty
+  minutes = int(minutes or DEFAULT_SHOW_DURATION)
+  if not 1 <= minutes <= MAX_SHOW_DURATION:
+    raise ValueError('a show lasts between 1 and %d minutes' % MAX_SHOW_DURATION)
+  return timedelta(minutes=minutes)
+
+def show_occurrences(start_time, recurrence=None, dates=()):
+  # sorted start times of a booking: `start_time`, the RFC 5545 `recurrence`
+  # rule expanded from it (e.g. 'FREQ=WEEKLY;COUNT=12') and the extra
+  # `dates` (a list or one per line), all strings. ValueError on a bad date
+  # or rule, or when there are none or more than MAX_OCCURRENCES.
+  import dateutil.parser
+  from dateutil.rrule import rrulestr
+  if isinstance(dates, str):
+    dates = dates.splitlines()
+  # JSON bookings can carry anything
+  if not all(isinstance(value, str) for value in [start_time or '', recurrence or ''] + list(dates)):
+    raise ValueError('dates and the recurrence must be strings')
+  starts = set()
+  try:
+    if start_time:
+      # the rule repeats in the start time's own zone, then every start is moved to UTC
+      first = dateutil.parser.parse(start_time)
+      if first.tzinfo is None:
+        first = _utc(first)
+      starts.add(_utc(first))
+      if recurrence:
+        starts.update(_utc(start) for start in islice(rrulestr(recurrence, dtstart=first), MAX_OCCURRENCES + 1))
+    elif recurrence:
+      raise ValueError('a recurrence needs a start time')
+    starts.update(_utc(dateutil.parser.parse(date)) for date in dates if date.strip())
+  except OverflowError:
+    raise ValueError('date out of range')
+  if not starts:
+    raise ValueError('no start time given')
+  if len(starts) > MAX_OCCURRENCES:
+    raise ValueError('more than %d shows in one booking' % MAX_OCCURRENCES)
+  return sorted(starts)
+
+def book_shows(venue_id, artist_id, start_times, duration):
+  # book the venue and artist for `duration` from each of the sorted
+  # `start_times`, all or nothing. Returns (start, end, conflicts) per
+  # occurrence, conflicts naming 'venue' and/or 'artist' when already booked
+  # then and 'occurrence' when the previous one runs into it. Without
+  # conflicts the shows go in with one multi-row INSERT, in the caller's
+  # transaction; the overlap constraints still catch concurrent bookings.
+  slots = [(start, start + duration) for start in start_times]
+
+  # one scan for every show of the venue or artist in the booked span. No
+  # show lasts longer than MAX_SHOW_DURATION, so none starting earlier than
+  # that before the first slot can reach it: both ends of the (owner,
+  # start_time) range are bounded.
+  booked = {'venue': ([], []), 'artist': ([], [])}
+  existing = db.session.query(Show.venue_id, Show.artist_id, Show.start_time, Show.end_time) \
+    .filter(or_(Show.venue_id == venue_id, Show.artist_id == artist_id),
+            Show.start_time > slots[0][0] - timedelta(minutes=MAX_SHOW_DURATION),
+            Show.start_time < slots[-1][1], Show.end_time > slots[0][0]) \
+    .order_by(Show.start_time)
+  for show_venue_id, show_artist_id, start, end in existing:
+    for name, matches in (('venue', show_venue_id == venue_id), ('artist', show_artist_id == artist_id)):
+      if matches:
+        booked[name][0].append(_utc(start))
+        booked[name][1].append(_utc(end))
+
+  report = []
+  for i, (start, end) in enumerate(slots):
+    conflicts = []
+    # as in the overlap constraints, only the owner's last show starting
+    # before `end` can overlap; existing shows never overlap each other
+    for name, (starts, ends) in booked.items():
+      previous = bisect.bisect_left(starts, end) - 1
+      if previous >= 0 and ends[previous] > start:
+        conflicts.append(name)
+    # occurrences all last `duration`, so only the previous one can reach
+    if i and slots[i - 1][1] > start:
+      conflicts.append('occurrence')
+    report.append((start, end, conflicts))
+
+  if not any(conflicts for _, _, conflicts in report):
+    db.session.execute(Show.__table__.insert().values([
+      {'venue_id': venue_id, 'artist_id': artist_id, 'start_time': start, 'end_time': end}
+      for start, end in slots]))
+    show_ids = [show_id for show_id, in db.session.query(Show.id)
+                .filter(Show.venue_id == venue_id, Show.start_time.in_(start_times))]
+    count_shows(show_ids, 1)
+  return report
+
+def split_shows(query):
+  # partition flagged show rows into (past, upcoming) lists of dicts in one pass
+  past_shows = []
+  upcoming_shows = []
+  for row in query:
+    show = row._asdict()
+    is_past = show.pop('is_past')
+    (past_shows if is_past else upcoming_shows).append(show)
+  return past_shows, upcoming_shows
+
+def detail_validators(model, owner_column, other_model, other_column, owner_id):
+  # (etag, last_modified) for a venue/artist page from one aggregate over its
+  # shows, or None when the venue/artist does not exist. The page changes when
+  # the owner, one of its shows, the other side of a show is written, or when
+  # a show is removed (count). Counting a show, on creation, deletion or
+  # rollover, writes the owner's counters and so its updated_at. The etag
+  # hashes revisions, which every write bumps, as two writes within a second
+  # can leave the updated_at values as they were.
+  row = db.session.query(
+      model.updated_at,
+      func.max(Show.updated_at),
+      func.max(other_model.updated_at),
+      func.count(Show.id),
+      model.revision,
+      func.sum(Show.revision),
+      func.sum(other_model.revision)
+    ).select_from(model) \
+    .outerjoin(Show, owner_column == model.id) \
+    .outerjoin(other_model, other_model.id == other_column) \
+    .filter(model.id == owner_id) \
+    .group_by(model.id) \
+    .first()
+  if row is None:
+    return None
+  etag = hashlib.sha1(repr(tuple(row)).encode()).hexdigest()
+  last_modified = max(value for value in row[:3] if value is not None)
+  return etag, last_modified
+
+def count_shows(show_ids, delta):
+  # move the upcoming/past counters of the shows' venues and artists by
+  # `delta` per show: 1 after inserting the shows, -1 before deleting them.
+  # Runs in the caller's transaction. The watermark row is share-locked so
+  # a concurrent rollover cannot pass these shows before they are counted.
+  watermark = db.session.query(ShowRollover.rolled_over_at).with_for_update(read=True).scalar()
+  is_past = (Show.start_time < watermark).label('is_past')
+  for model, owner_column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+    counts = db.session.query(owner_column, is_past, func.count(Show.id)) \
+      .filter(Show.id.in_(show_ids)) \
+      .group_by(owner_column, is_past)
+    for owner_id, past, count in counts.all():
+      adjust_counters(model, owner_id, 0 if past else delta * count, delta * count if past else 0)
+
+def adjust_counters(model, owner_id, upcoming, past):
+  table = model.__table__
+  db.session.execute(table.update().where(table.c.id == owner_id).values(
+    upcoming_shows_count=table.c.upcoming_shows_count + upcoming,
+    past_shows_count=table.c.past_shows_count + past))
+
+def not_modified(etag, last_modified):
+  # a bodyless 304 when the request's If-None-Match/If-Modified-Since still
+  # match, else None. pending flash messages always get a full render.
+  if '_flashes' in session:
+    return None
+  response = Response()
+  response.set_etag(etag)
+  response.last_modified = last_modified
+  response.make_conditional(request)
+  return response if response.status_code == 304 else None
+
+def with_validators(html, etag, last_modified):
+  response = make_response(html)
+  response.set_etag(etag)
+  response.last_modified = last_modified
+  response.cache_control.no_cache = True
+  return response
+
+def keyset_page(query, keys, parse_cursor, format_cursor):
+  # one page of `query` ordered by the `keys` columns, positioned by the
+  # ?after= / ?before= cursors instead of an OFFSET so every page is a range
+  # scan over the ordering index. Returns the rows and the neighbouring cursors.
+  # a negative LIMIT is "no limit" on SQLite and an error on Postgres
+  per_page = max(1, min(request.args.get('per_page', current_app.config['PAGE_SIZE'], type=int) or current_app.config['PAGE_SIZE'],
+                        current_app.config['MAX_PAGE_SIZE']))
+  after = request.args.get('after')
+  before = request.args.get('before')
+  position = tuple_(*keys) if len(keys) > 1 else keys[0]
+
+  try:
+    if before:
+      rows = query.filter(position < parse_cursor(before)) \
+        .order_by(*[key.desc() for key in keys]).limit(per_page + 1).all()
+      has_prev, has_next = len(rows) > per_page, True
+      rows = rows[:per_page][::-1]
+    else:
+      if after:
+        query = query.filter(position > parse_cursor(after))
+      rows = query.order_by(*keys).limit(per_page + 1).all()
+      has_prev, has_next = bool(after), len(rows) > per_page
+      rows = rows[:per_page]
+  except ValueError:
+    abort(400)
+
+  return {
+    "items": rows,
+    "per_page": per_page,
+    "prev": format_cursor(rows[0]) if rows and has_prev else None,
+    "next": format_cursor(rows[-1]) if rows and has_next else None
+  }
+
+def page_url(**cursor):
+  # the current listing with its filters, moved to another page by `cursor`
+  args = request.args.to_dict()
+  args.pop('after', None)
+  args.pop('before', None)
+  args.update(cursor)
+  return url_for(request.endpoint, **dict(request.view_args, **args))
+
+def parse_show_cursor(cursor):
+  start_time, _, show_id = cursor.rpartition('_')
+  return (datetime.fromisoformat(start_time), int(show_id))
+
+def format_show_cursor(show):
+  return '%s_%d' % (show.start_time.isoformat(), show.id)
+
+def cached_page(render):
+  # serve the rendered listing page from the page cache. `render` returns the
+  # html and the tags the handlers invalidate when the underlying rows change.
+  # pages carrying flashed messages are one-off and bypass the cache, as do
+  # the pages of a client reading its own writes from the primary: the
+  # cached ones may come from a replica that has not caught up.
+  if '_flashes' in session or reading_own_writes():
+    return render()[0]
+  page_cache = current_cache()
+  key = request.full_path
+  html = page_cache.get(key)
+  if html is None:
+    html, tags = render()
+    page_cache.set(key, html, tags)
+  return html
+
+def _json_default(value):
+  if isinstance(value, datetime):
+    return value.isoformat()
+  raise TypeError('%r is not JSON serializable' % value)
+
+def dump_json(payload):
+  # compact JSON, encoded with orjson when it is installed
+  if orjson is not None:
+    return orjson.dumps(payload)
+  return json.dumps(payload, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+#----------------------------------------------------------------------------#
+# Export.
+#----------------------------------------------------------------------------#
+
+EXPORT_FIELDS = (Show.id.label('show_id'), Show.start_time, Show.end_time,
+  Show.venue_id, Venue.name.label('venue_name'), Venue.city.label('venue_city'),
+  Venue.state.label('venue_state'), Venue.address.label('venue_address'),
+  Show.artist_id, Artist.name.label('artist_name'), Artist.city.label('artist_city'),
+  Artist.state.label('artist_state'))
+EXPORT_FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+# rows fetched from the server-side cursor, and written out, per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+def export_shows_query(start=None, end=None, venue_id=None, artist_id=None):
+  query = db.session.query(*EXPORT_FIELDS) \
+    .join(Venue, Venue.id == Show.venue_id) \
+    .join(Artist, Artist.id == Show.artist_id)
+  query = filter_shows(query, start, end, venue_id, artist_id)
+  # a server-side cursor keeps memory flat however many shows match
+  return query.order_by(Show.start_time, Show.id) \
+    .execution_options(stream_results=True) \
+    .yield_per(EXPORT_CHUNK_SIZE)
+
+def export_lines(query, format):
+  # the export as a stream of text chunks, one per EXPORT_CHUNK_SIZE rows
+  columns = [field.key for field in EXPORT_FIELDS]
+  buffer = io.StringIO()
+  writer = csv.writer(buffer)
+  if format == 'csv':
+    writer.writerow(columns)
+  count = 0
+  for row in query:
+    if format == 'csv':
+      writer.writerow(row)
+    else:
+      buffer.write(dump_json(row._asdict()).decode('utf-8'))
+      buffer.write('\n')
+    count += 1
+    if count % EXPORT_CHUNK_SIZE == 0:
+      yield buffer.getvalue()
+      buffer.seek(0)
+      buffer.truncate()
+  yield buffer.getvalue()
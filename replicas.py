@@ -0,0 +1,84 @@
+import itertools
+import threading
+import time
+
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import orm
+
+
+# methods that never write, and may be served from a replica
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# session key holding the time until which this client reads from the primary
+STICKY_KEY = '_read_primary_until'
+
+
+def read_only(view):
+    '''Mark a non-GET view (e.g. a search form POST) as safe for replicas.'''
+    view.read_only = True
+    return view
+
+
+def _is_read(app):
+    view = app.view_functions.get(request.endpoint)
+    return request.method in READ_METHODS or getattr(view, 'read_only', False)
+
+
+def reading_own_writes():
+    '''Whether this client wrote within READ_YOUR_WRITES_SECONDS and so reads from the primary.'''
+    return session.get(STICKY_KEY, 0) >= time.time()
+
+
+class RoutingSession(SignallingSession):
+    '''Session that reads through the replica bind picked for the request.
+
+    Flushes always go to the primary, as does everything outside a request
+    (CLI commands, migrations) or when no replica was picked.
+    '''
+
+    def __init__(self, db, **options):
+        # SignallingSession only keeps the app, the replica engines come from db
+        self.db = db
+        super(RoutingSession, self).__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind_key = g.get('db_bind') if has_request_context() else None
+        if bind_key is not None and not self._flushing:
+            return self.db.get_engine(self.app, bind=bind_key)
+        return super(RoutingSession, self).get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def init_app(app):
+    '''Route read-only requests round-robin across SQLALCHEMY_REPLICA_BINDS.
+
+    A client that just wrote keeps reading from the primary for
+    READ_YOUR_WRITES_SECONDS, so it sees its own changes despite replica lag.
+    The page cache, filled from replica reads, is bypassed meanwhile.
+    '''
+    replicas = app.config.get('SQLALCHEMY_REPLICA_BINDS') or []
+    if not replicas:
+        return
+    window = app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+    next_replica = itertools.cycle(replicas).__next__
+    lock = threading.Lock()
+
+    @app.before_request
+    def pick_bind():
+        # None is the primary, set either way so no earlier pick lingers in g
+        if _is_read(app) and not reading_own_writes():
+            with lock:
+                g.db_bind = next_replica()
+        else:
+            g.db_bind = None
+
+    @app.after_request
+    def stick_to_primary(response):
+        if not _is_read(app):
+            session[STICKY_KEY] = time.time() + window
+        return response
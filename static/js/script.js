@@ -2,3 +2,33 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// Inputs with data-autocomplete="<url>" suggest names from that endpoint.
+// The suggestions go in a <datalist> whose option values are the ids.
+document.addEventListener('DOMContentLoaded', function () {
+  var inputs = document.querySelectorAll('input[data-autocomplete]');
+  Array.prototype.forEach.call(inputs, function (input) {
+    var list = document.createElement('datalist');
+    var pending;
+    list.id = input.id + '-suggestions';
+    input.parentNode.appendChild(list);
+    input.setAttribute('list', list.id);
+    input.addEventListener('input', function () {
+      clearTimeout(pending);
+      if (!input.value || /^\d+$/.test(input.value)) return;
+      pending = setTimeout(function () {
+        fetch(input.dataset.autocomplete + '?q=' + encodeURIComponent(input.value))
+          .then(function (response) { return response.json(); })
+          .then(function (body) {
+            list.innerHTML = '';
+            body.data.forEach(function (match) {
+              var option = document.createElement('option');
+              option.value = match.id;
+              option.label = match.name;
+              list.appendChild(option);
+            });
+          });
+      }, 100);
+    });
+  });
+});
@@ -0,0 +1,85 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from cache import create_cache
+
+templates_cli = AppGroup('templates', help='Precompile the Jinja templates.')
+
+
+class FragmentCacheExtension(Extension):
+    '''`{% cache key, ... %}...{% endcache %}` stores the rendered block.
+
+    The block is rendered once per distinct key and then served from the
+    environment's fragment_cache. Keys carry the revision of every row the
+    block shows, so an edit produces a new key instead of an invalidation:
+
+        {% cache 'artist-tile', artist.id, artist.revision %}...{% endcache %}
+    '''
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super(FragmentCacheExtension, self).__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render_cached', [nodes.List(parts)]),
+                               [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, parts, caller):
+        fragment_cache = self.environment.fragment_cache
+        if fragment_cache is None:
+            return caller()
+        key = 'fragment:' + ':'.join(str(part) for part in parts)
+        html = fragment_cache.get(key)
+        if html is None:
+            html = caller()
+            fragment_cache.set(key, html)
+        # a shared backend may hand the markup back as a plain string
+        return Markup(html)
+
+
+def compile_templates(app):
+    '''Load every template, which writes its bytecode to the cache.'''
+    names = app.jinja_env.list_templates(extensions=['html'])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+
+def init_app(app):
+    '''Cache compiled templates on disk and enable {% cache %} fragments.
+
+    With TEMPLATE_BYTECODE_CACHE set, a worker loads the bytecode of a
+    template instead of compiling it; `flask templates compile` fills the
+    cache at deploy time.
+    '''
+    directory = app.config.get('TEMPLATE_BYTECODE_CACHE')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = create_cache(app.config, 'FRAGMENT_CACHE')
+    app.extensions['fragment_cache'] = app.jinja_env.fragment_cache
+    app.cli.add_command(templates_cli)
+
+
+@templates_cli.command('compile')
+def compile_command():
+    '''Compile every template into the bytecode cache.'''
+    if current_app.jinja_env.bytecode_cache is None:
+        raise click.ClickException('TEMPLATE_BYTECODE_CACHE is not set.')
+    names = compile_templates(current_app)
+    click.echo('Compiled %d templates into %s' % (len(names), current_app.config['TEMPLATE_BYTECODE_CACHE']))
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from models import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///%s' % (tmp_path / 'fyyur.db'),
+        'TEMPLATE_BYTECODE_CACHE': None,
+        'MIGRATE': False,
+        # no background rebuilds racing the tests, they call rebuild() themselves
+        'AUTOCOMPLETE_REFRESH': 0,
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class StatementCounter(object):
+    '''Counts the SQL statements run on `engine` while it is listening.'''
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
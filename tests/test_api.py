@@ -0,0 +1,15 @@
+from models import db, Venue, Artist
+
+
+def book(client, **booking):
+    return client.post('/api/v1/shows', json=dict({'venue_id': 1, 'artist_id': 1}, **booking))
+
+
+def test_create_shows_rejects_non_string_dates(app, client):
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Artist(id=1, name='Guns N Petals')])
+    db.session.commit()
+
+    response = book(client, start_time='2030-01-01 20:00', dates=[123])
+
+    assert response.status_code == 400
+    assert Venue.query.get(1).upcoming_shows_count == 0
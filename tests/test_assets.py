@@ -0,0 +1,62 @@
+import gzip
+import os
+import shutil
+
+import pytest
+from flask import Flask, render_template_string
+
+import assets
+
+STATIC = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+
+
+@pytest.fixture
+def static_folder(tmp_path):
+    # a copy of the bundled sources, so the build leaves static/dist alone
+    folder = tmp_path / 'static'
+    for sources in assets.BUNDLES.values():
+        for source in sources:
+            os.makedirs(folder / os.path.dirname(source), exist_ok=True)
+            shutil.copy(os.path.join(STATIC, source), folder / source)
+    return str(folder)
+
+
+def asset_app(static_folder):
+    app = Flask(__name__, static_folder=static_folder)
+    assets.init_app(app)
+    return app
+
+
+def test_templates_use_the_sources_until_a_build(static_folder):
+    with asset_app(static_folder).test_request_context():
+        urls = render_template_string("{{ asset_urls('js/head.js')|join(' ') }}")
+
+    assert urls == '/static/js/libs/modernizr-2.8.2.min.js /static/js/libs/moment.min.js'
+
+
+def test_built_bundles_are_served_precompressed_and_immutable(static_folder):
+    manifest = assets.build(static_folder)
+    client = asset_app(static_folder).test_client()
+    with client.application.test_request_context():
+        assert render_template_string("{{ asset_urls('css/fyyur.css')[0] }}") == '/static/' + manifest['css/fyyur.css']
+
+    plain = client.get('/static/' + manifest['css/fyyur.css'])
+    compressed = client.get('/static/' + manifest['css/fyyur.css'], headers={'Accept-Encoding': 'gzip'})
+
+    assert plain.mimetype == compressed.mimetype == 'text/css'
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['Cache-Control'] == assets.IMMUTABLE
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert client.get('/static/dist/fyyur.0000.css').status_code == 404
+
+
+def test_build_fingerprints_by_content(static_folder):
+    first = assets.build(static_folder)
+    with open(os.path.join(static_folder, 'js/script.js'), 'a') as f:
+        f.write('\nwindow.rebuilt = true;\n')
+    second = assets.build(static_folder)
+
+    assert first['js/deferred.js'] != second['js/deferred.js']
+    assert first['css/fyyur.css'] == second['css/fyyur.css']
@@ -0,0 +1,47 @@
+from app import create_app
+from models import db, Venue, Artist
+
+
+def suggestions(client, kind, q):
+    response = client.get('/autocomplete/%s?q=%s' % (kind, q))
+    assert response.status_code == 200
+    return [match['name'] for match in response.get_json()['data']]
+
+
+def test_indexes_are_built_by_the_first_lookup(app, client):
+    db.session.add_all([Venue(name='The Musical Hop'), Artist(name='The Wild Sax Band')])
+    db.session.commit()
+    autocomplete = app.extensions['autocomplete']
+    assert not autocomplete.built
+
+    assert suggestions(client, 'venues', 'hop') == ['The Musical Hop']
+    assert suggestions(client, 'artists', 'sax') == ['The Wild Sax Band']
+    assert autocomplete.built
+
+
+def test_creating_the_app_reads_no_table(tmp_path):
+    # the database has no tables at all, as under a first `flask db upgrade`
+    config = {'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///%s' % (tmp_path / 'empty.db'),
+              'TEMPLATE_BYTECODE_CACHE': None, 'MIGRATE': False}
+    app = create_app(config)
+
+    with app.app_context():
+        assert db.engine.table_names() == []
+    assert not app.extensions['autocomplete'].built
+
+
+def test_updates_made_during_a_rebuild_are_kept(app, client, monkeypatch):
+    autocomplete = app.extensions['autocomplete']
+    read = autocomplete._read
+
+    def read_then_add():
+        rows = read()
+        # a venue is created once the rebuild has read the tables
+        autocomplete.add(Venue, 7, 'Park Square Live Music')
+        return rows
+
+    monkeypatch.setattr(autocomplete, '_read', read_then_add)
+    autocomplete.rebuild()
+    monkeypatch.undo()
+
+    assert suggestions(client, 'venues', 'park') == ['Park Square Live Music']
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from cache import current_cache
+from models import db, Venue, Artist, Show, ShowRollover
+from queries import book_shows
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def booked(app):
+    # two shows that started after the last rollover, so still counted as upcoming
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Artist(id=1, name='Guns N Petals'),
+                        Artist(id=2, name='Matt Quevedo')])
+    ShowRollover.query.one().rolled_over_at = NOW - timedelta(days=2)
+    db.session.commit()
+    book_shows(1, 1, [NOW - timedelta(days=1)], timedelta(hours=2))
+    book_shows(1, 2, [NOW - timedelta(hours=6)], timedelta(hours=2))
+    db.session.commit()
+
+
+def test_rollover_moves_started_shows_to_past(app, booked):
+    current_cache().set('/venues', 'stale page', ['venues'])
+
+    result = app.test_cli_runner().invoke(args=['fyyur', 'rollover'])
+
+    assert result.output == 'Rolled over 2 shows.\n'
+    venue = Venue.query.get(1)
+    assert (venue.upcoming_shows_count, venue.past_shows_count) == (0, 2)
+    assert (Artist.query.get(2).upcoming_shows_count, Artist.query.get(2).past_shows_count) == (0, 1)
+    assert current_cache().get('/venues') is None
+
+
+def test_check_counters_reports_and_repairs_drift(app, booked):
+    Venue.query.get(1).upcoming_shows_count = 5
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['fyyur', 'check-counters', '--dry-run'])
+    assert result.exit_code == 1
+    assert result.output == 'Venue 1: upcoming 5 -> 2, past 0 -> 0\n1 counters drifted.\n'
+
+    result = runner.invoke(args=['fyyur', 'check-counters'])
+    assert result.output.endswith('Repaired 1 counters.\n')
+    assert Venue.query.get(1).upcoming_shows_count == 2
+    assert runner.invoke(args=['fyyur', 'check-counters', '--dry-run']).exit_code == 0
+
+
+def test_deleting_a_show_uncounts_it(app, booked, client):
+    show = Show.query.filter_by(artist_id=2).one()
+
+    assert client.delete('/shows/%d' % show.id).status_code == 200
+    assert Venue.query.get(1).upcoming_shows_count == 1
+    assert client.delete('/shows/%d' % show.id).status_code == 404
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import db, Venue, Artist, ShowRollover
+from queries import book_shows
+from tests.conftest import StatementCounter
+
+NOW = datetime.now(timezone.utc)
+
+
+def book(artists, days):
+    for artist_id in range(1, artists + 1):
+        start = NOW + timedelta(days=days, hours=3 * artist_id)
+        book_shows(1, artist_id, [start], timedelta(hours=2))
+    db.session.commit()
+
+
+@pytest.fixture
+def venue(app):
+    db.session.add(Venue(id=1, name='The Musical Hop'))
+    db.session.add_all([Artist(id=i, name='Artist %d' % i) for i in range(1, 21)])
+    db.session.commit()
+
+
+def statements(client, url):
+    db.session.remove()
+    with StatementCounter(db.engine) as counter:
+        assert client.get(url).status_code == 200
+    return counter.count
+
+
+def test_detail_pages_run_a_fixed_number_of_statements(venue, client):
+    book(2, 1)
+    few = statements(client, '/venues/1'), statements(client, '/artists/1')
+    book(20, 2)
+    many = statements(client, '/venues/1'), statements(client, '/artists/1')
+
+    assert few == many
+
+
+def test_detail_pages_split_past_and_upcoming_shows(venue, client):
+    ShowRollover.query.one().rolled_over_at = NOW - timedelta(days=2)
+    db.session.commit()
+    book(1, -1)
+    book(2, 1)
+    client.application.test_cli_runner().invoke(args=['fyyur', 'rollover'])
+
+    data = client.get('/api/v1/venues/1').get_json()
+    assert [show['artist_id'] for show in data['past_shows']] == [1]
+    assert [show['artist_id'] for show in data['upcoming_shows']] == [1, 2]
+    html = ' '.join(client.get('/venues/1').get_data(as_text=True).split())
+    assert '2 Upcoming Shows' in html and '1 Past Show' in html
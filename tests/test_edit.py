@@ -0,0 +1,47 @@
+from models import db, Venue, Artist
+
+
+def venue_form(name):
+    return {'name': name, 'city': 'Austin', 'state': 'TX', 'address': '1 Main St', 'phone': '555-0100',
+            'image_link': 'https://images.example.com/venue.jpg', 'facebook_link': 'https://www.facebook.com/venue',
+            'genres': ['Jazz', 'Folk']}
+
+
+def artist_form(name):
+    return {'name': name, 'city': 'Austin', 'state': 'TX', 'phone': '555-0100',
+            'image_link': 'https://images.example.com/artist.jpg', 'facebook_link': 'https://www.facebook.com/artist',
+            'genres': ['Jazz']}
+
+
+def test_edit_venue(client):
+    client.post('/venues/create', data=venue_form('The Musical Hop'))
+    venue_id = Venue.query.filter_by(name='The Musical Hop').one().id
+
+    client.post('/venues/%d/edit' % venue_id, data=venue_form('The Musical Hop Two'))
+
+    db.session.remove()
+    venue = Venue.query.get(venue_id)
+    assert (venue.name, venue.phone, venue.genre_names) == ('The Musical Hop Two', '555-0100', ['Folk', 'Jazz'])
+
+
+def test_edit_artist(client):
+    client.post('/artists/create', data=artist_form('Guns N Petals'))
+    artist_id = Artist.query.filter_by(name='Guns N Petals').one().id
+
+    client.post('/artists/%d/edit' % artist_id, data=artist_form('Guns N Roses'))
+
+    db.session.remove()
+    artist = Artist.query.get(artist_id)
+    assert (artist.name, artist.phone, artist.genre_names) == ('Guns N Roses', '555-0100', ['Jazz'])
+
+
+def test_edits_within_a_second_change_the_etag(client):
+    client.post('/venues/create', data=venue_form('The Musical Hop'))
+    venue_id = Venue.query.filter_by(name='The Musical Hop').one().id
+    etags = [client.get('/venues/%d' % venue_id).headers['ETag']]
+
+    for name in ('The Musical Hop Two', 'The Musical Hop Three'):
+        client.post('/venues/%d/edit' % venue_id, data=venue_form(name))
+        etags.append(client.get('/venues/%d' % venue_id).headers['ETag'])
+
+    assert len(set(etags)) == 3
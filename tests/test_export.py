@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import queries
+from models import db, Venue, Artist, Show
+
+START = datetime(2030, 1, 1, 20, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def shows(app):
+    db.session.add_all([Venue(id=1, name='The Musical Hop', city='San Francisco'), Venue(id=2, name='Park Square'),
+                        Artist(id=1, name='Guns N Petals'), Artist(id=2, name='Matt Quevedo')])
+    db.session.flush()
+    for day in range(3):
+        for owner in (1, 2):
+            start = START + timedelta(days=day)
+            db.session.add(Show(venue_id=owner, artist_id=owner, start_time=start, end_time=start + timedelta(hours=2)))
+    db.session.commit()
+
+
+def test_csv_export_lists_shows_in_start_order(shows, client):
+    response = client.get('/export/shows.csv?venue_id=1&from=2030-01-02')
+
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=shows.csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['venue_name'], row['venue_city'], row['start_time'][:10]) for row in rows] == [
+        ('The Musical Hop', 'San Francisco', '2030-01-02'), ('The Musical Hop', 'San Francisco', '2030-01-03')]
+
+
+def test_jsonl_export_has_one_show_per_line(shows, client):
+    response = client.get('/export/shows.jsonl?artist_id=2')
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['artist_name'] for line in lines] == ['Matt Quevedo'] * 3
+    assert set(lines[0]) == {field.key for field in queries.EXPORT_FIELDS}
+
+
+def test_unknown_export_formats_are_not_found(shows, client):
+    assert client.get('/export/shows.xml').status_code == 404
+    assert client.get('/export/shows.csv?from=someday').status_code == 400
+
+
+def test_export_streams_a_chunk_per_batch_of_rows(shows, monkeypatch):
+    monkeypatch.setattr(queries, 'EXPORT_CHUNK_SIZE', 4)
+
+    chunks = list(queries.export_lines(queries.export_shows_query(), 'jsonl'))
+
+    assert [chunk.count('\n') for chunk in chunks] == [4, 2]
+
+
+def test_export_command_writes_the_same_csv(shows, client, tmp_path):
+    path = tmp_path / 'shows.csv'
+    result = client.application.test_cli_runner().invoke(
+        args=['fyyur', 'export', str(path), '--from', '2030-01-02', '--venue-id', '1'])
+
+    assert result.exit_code == 0
+    assert path.read_bytes() == \
+        client.get('/export/shows.csv?venue_id=1&from=2030-01-02').get_data()
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+
+import babel.dates
+import pytest
+
+from filters import DATETIME_PATTERNS, format_datetime
+
+UTC_EVENING = datetime(2030, 5, 21, 21, 30, tzinfo=timezone.utc)
+VALUES = [
+    UTC_EVENING,
+    UTC_EVENING.astimezone(timezone(timedelta(hours=-7))),
+    datetime(2030, 12, 31, 23, 59),
+    '2019-06-15T23:00:00.000Z',
+    '2035-04-01T20:00:00+02:00',
+]
+
+
+@pytest.mark.parametrize('format', ['full', 'medium'])
+@pytest.mark.parametrize('value', VALUES)
+def test_format_datetime_matches_babel_in_utc(value, format):
+    date = datetime.fromisoformat(value.replace('Z', '+00:00')) if isinstance(value, str) else value
+    expected = babel.dates.format_datetime(date, DATETIME_PATTERNS[format], tzinfo=timezone.utc)
+
+    assert format_datetime(value, format) == expected
+
+
+def test_equal_instants_render_alike_whatever_their_offset():
+    format_datetime.cache_clear()
+    assert format_datetime(UTC_EVENING, 'full') == 'Tuesday May, 21, 2030 at 9:30PM'
+    assert format_datetime(UTC_EVENING.astimezone(timezone(timedelta(hours=2))), 'full') == \
+        'Tuesday May, 21, 2030 at 9:30PM'
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+
+from models import db, Venue, Artist, Show
+from tests.test_edit import artist_form
+
+START = datetime(2030, 1, 1, 20, tzinfo=timezone.utc)
+
+
+def fragment_stats(client):
+    return client.get('/cache/stats').get_json()['fragments']
+
+
+def test_tiles_are_rendered_once_across_pages(app, client):
+    db.session.add_all([Artist(id=i, name='Artist %d' % i) for i in range(1, 4)])
+    db.session.commit()
+
+    client.get('/artists?per_page=2')
+    client.get('/artists?per_page=3')
+
+    stats = fragment_stats(client)
+    assert (stats['entries'], stats['hits'], stats['misses']) == (3, 2, 3)
+
+
+def test_edits_within_a_second_render_new_tiles(app, client):
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Artist(id=1, name='Artist 1')])
+    db.session.add(Show(venue_id=1, artist_id=1, start_time=START, end_time=START + timedelta(hours=2)))
+    db.session.commit()
+
+    for name in ('Guns N Petals', 'Guns N Roses'):
+        client.post('/artists/1/edit', data=artist_form(name))
+        assert name in client.get('/artists').get_data(as_text=True)
+        assert name in client.get('/shows').get_data(as_text=True)
@@ -0,0 +1,52 @@
+from models import db, Venue, Artist, Show
+
+
+def import_file(app, tmp_path, kind, name, content, batch_size=2):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return app.test_cli_runner().invoke(args=['fyyur', 'import', kind, str(path), '--batch-size', str(batch_size)])
+
+
+def test_import_venues_skips_nameless_and_taken_names(app, tmp_path):
+    result = import_file(app, tmp_path, 'venues', 'venues.csv',
+                         'name,city,genres\n'
+                         'The Dueling Pianos Bar,New York,"Classical, R&B"\n'
+                         ',Nowhere,Jazz\n'
+                         'The Dueling Pianos Bar,San Francisco,Folk\n'
+                         'Park Square Live Music,San Francisco,Folk\n')
+
+    assert result.exit_code == 0
+    assert result.output.endswith('skipped 2.\n')
+    venues = Venue.query.order_by(Venue.id).all()
+    assert [(venue.name, sorted(genre.name for genre in venue.genres)) for venue in venues] == [
+        ('The Dueling Pianos Bar', ['Classical', 'R&B']), ('Park Square Live Music', ['Folk'])]
+
+
+def test_import_artists_keeps_the_first_of_a_repeated_name(app, tmp_path):
+    result = import_file(app, tmp_path, 'artists', 'artists.jsonl',
+                         '{"name": "Matt Quevedo", "genres": ["Jazz"], "seeking_venue": "no"}\n'
+                         '{"name": "Matt Quevedo", "genres": ["Rock n Roll"]}\n'
+                         '{"name": "The Wild Sax Band", "genres": ["Jazz", "Classical"], "seeking_venue": "yes"}\n',
+                         batch_size=10)
+
+    assert result.exit_code == 0
+    assert result.output.endswith('skipped 1.\n')
+    artists = Artist.query.order_by(Artist.id).all()
+    assert [(artist.name, artist.seeking_venue, sorted(artist.genre_names)) for artist in artists] == [
+        ('Matt Quevedo', False, ['Jazz']), ('The Wild Sax Band', True, ['Classical', 'Jazz'])]
+
+
+def test_import_shows_resolves_names_and_counts_them(app, tmp_path):
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Artist(id=1, name='Guns N Petals')])
+    db.session.commit()
+
+    result = import_file(app, tmp_path, 'shows', 'shows.jsonl',
+                         '{"venue": "The Musical Hop", "artist_id": 1, "start_time": "2035-04-01T20:00:00"}\n'
+                         '{"venue": "Nowhere", "artist_id": 1, "start_time": "2035-04-02T20:00:00"}\n'
+                         '{"venue_id": 1, "artist": "Guns N Petals", "start_time": "2035-04-03T20:00:00+02:00",'
+                         ' "duration": 90}\n')
+
+    assert result.exit_code == 0
+    assert result.output.endswith('skipped 1.\n')
+    assert Show.query.count() == 2
+    assert Venue.query.get(1).upcoming_shows_count == 2
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from instrumentation import SLOWEST, RequestSQLStats
+from models import db
+
+
+def test_failed_statements_leave_no_start_time_behind(app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(db.text('SELECT * FROM no_such_table'))
+        connection.execute(db.text('SELECT 1'))
+
+        assert connection.info.get('query_start') == []
+
+
+def test_server_timing_names_the_slowest_statements(client):
+    response = client.get('/venues')
+
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;desc="')
+    assert 'sql1;dur=' in timing
+    assert ';desc="SELECT ' in timing
+    assert ', total;dur=' in timing
+
+
+def test_server_timing_lists_the_slowest_first_trimmed_and_quoted():
+    stats = RequestSQLStats()
+    for elapsed, statement in [(0.001, 'SELECT 1'), (0.004, 'SELECT "Venue".name\n  FROM "Venue"'),
+                               (0.002, 'SELECT ' + 'x, ' * 100), (0.003, 'SELECT 3')]:
+        stats.record(statement, elapsed)
+
+    entries = stats.server_timing(9.5).split(', sql')
+    assert entries[1] == '1;dur=4.00;desc="SELECT \\"Venue\\".name FROM \\"Venue\\""'
+    assert entries[2] == '2;dur=3.00;desc="SELECT 3"'
+    assert entries[3].startswith('3;dur=2.00;desc="SELECT x, ')
+    assert entries[3].endswith('...", total;dur=9.50')
+    assert len(entries) == 1 + SLOWEST
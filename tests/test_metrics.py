@@ -0,0 +1,24 @@
+import threading
+
+import pytest
+
+from metrics import Registry
+
+
+def test_shards_of_finished_threads_are_folded():
+    registry = Registry()
+
+    def record():
+        registry.inc('requests_started')
+        registry.observe('latency', (), 0.02, (0.01, 0.1))
+
+    for _ in range(50):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+
+    totals = registry.collect()
+    assert totals[('requests_started', ())] == 50
+    assert totals[('latency', ())][:3] == [0, 50, 0]
+    assert totals[('latency', ())][3] == pytest.approx(1.0)
+    assert registry._shards == []
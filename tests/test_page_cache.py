@@ -0,0 +1,43 @@
+from models import db, Venue, Artist
+from tests.conftest import StatementCounter
+from tests.test_edit import artist_form, venue_form
+
+
+def test_listing_pages_are_served_from_the_cache(app, client):
+    client.get('/venues')
+
+    with StatementCounter(db.engine) as counter:
+        client.get('/venues')
+    assert counter.count == 0
+
+
+def test_creating_a_venue_invalidates_venues(client):
+    client.get('/venues')
+    client.post('/venues/create', data=venue_form('The Musical Hop'))
+
+    assert 'The Musical Hop' in client.get('/venues').get_data(as_text=True)
+
+
+def test_editing_an_artist_invalidates_the_pages_listing_it(app, client):
+    db.session.add_all([Artist(id=i, name='Artist %d' % i) for i in range(1, 4)])
+    db.session.commit()
+    first_page, last_page = '/artists?per_page=2', '/artists?per_page=2&after=2'
+    client.get(first_page)
+    client.get(last_page)
+
+    client.post('/artists/1/edit', data=artist_form('Guns N Petals'))
+    assert 'Guns N Petals' in client.get(first_page).get_data(as_text=True)
+
+    client.post('/artists/create', data=dict(artist_form('The Wild Sax Band'),
+                                             image_link='https://images.example.com/sax.jpg'))
+    assert 'The Wild Sax Band' in client.get(last_page).get_data(as_text=True)
+
+
+def test_booking_shows_invalidates_shows(app, client):
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Artist(id=1, name='Guns N Petals')])
+    db.session.commit()
+    client.get('/shows')
+
+    response = client.post('/api/v1/shows', json={'venue_id': 1, 'artist_id': 1, 'start_time': '2030-01-01 20:00'})
+    assert response.status_code == 201
+    assert 'Guns N Petals' in client.get('/shows').get_data(as_text=True)
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import db, Venue, Artist, Show
+
+START = datetime(2030, 1, 1, 20, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def shows(app):
+    # three shows share a start time, so only the id orders them
+    starts = [START, START, START, START + timedelta(days=1), START + timedelta(days=2)]
+    for i, start in enumerate(starts, 1):
+        db.session.add_all([Venue(id=i, name='Venue %d' % i), Artist(id=i, name='Artist %d' % i)])
+        db.session.flush()
+        db.session.add(Show(id=i, venue_id=i, artist_id=i, start_time=start, end_time=start + timedelta(hours=2)))
+    db.session.commit()
+
+
+def walk(client, direction, url):
+    # every page from `url` on, following the `direction` cursors
+    pages = []
+    while url:
+        page = client.get(url).get_json()
+        pages.append([show['artist_id'] for show in page['data']])
+        url = page[direction] and '/api/v1/shows?per_page=2&%s=%s' % (
+            'after' if direction == 'next' else 'before', page[direction])
+    return pages
+
+
+def test_show_cursors_walk_every_show_once_both_ways(shows, client):
+    assert walk(client, 'next', '/api/v1/shows?per_page=2') == [[1, 2], [3, 4], [5]]
+    # back from the last show, whose cursor is its start time and id
+    assert walk(client, 'prev', '/api/v1/shows?per_page=2&before=2030-01-03T20:00:00_5') == [[3, 4], [1, 2]]
+
+
+def test_per_page_is_clamped(shows, client):
+    assert len(client.get('/api/v1/shows?per_page=-1').get_json()['data']) == 1
+    assert len(client.get('/api/v1/shows?per_page=1000').get_json()['data']) == 5
+
+
+def test_bad_cursors_are_rejected(shows, client):
+    assert client.get('/api/v1/shows?after=yesterday_1').status_code == 400
+    assert client.get('/artists?after=last').status_code == 400
+
+
+def test_artist_pages_link_to_their_neighbours(shows, client):
+    html = client.get('/artists?per_page=2&after=2').get_data(as_text=True)
+
+    assert 'Artist 3' in html and 'Artist 4' in html and 'Artist 2' not in html
+    assert 'href="/artists?per_page=2&amp;before=3"' in html
+    assert 'href="/artists?per_page=2&amp;after=4"' in html
@@ -0,0 +1,74 @@
+import pytest
+
+from app import create_app
+from models import db, Venue
+
+
+@pytest.fixture
+def replicated_app(tmp_path):
+    # a primary and two replicas, each seeded with a venue naming its database
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///%s' % (tmp_path / 'primary.db'),
+        'SQLALCHEMY_BINDS': {
+            'replica_1': 'sqlite:///%s' % (tmp_path / 'replica_1.db'),
+            'replica_2': 'sqlite:///%s' % (tmp_path / 'replica_2.db'),
+        },
+        'SQLALCHEMY_REPLICA_BINDS': ['replica_1', 'replica_2'],
+        'AUTOCOMPLETE_REFRESH': 0,
+        'TEMPLATE_BYTECODE_CACHE': None,
+        'MIGRATE': False,
+    })
+    with app.app_context():
+        for bind in (None, 'replica_1', 'replica_2'):
+            engine = db.get_engine(app, bind=bind)
+            db.Model.metadata.create_all(bind=engine)
+            with engine.begin() as connection:
+                connection.execute(Venue.__table__.insert(), {'name': bind or 'primary'})
+        yield app
+        db.session.remove()
+
+
+def venue_names(client):
+    response = client.get('/api/v1/venues')
+    assert response.status_code == 200
+    return [venue['name'] for venue in response.get_json()['data']]
+
+
+def create_venue(client):
+    client.post('/venues/create', data={
+        'name': 'The Musical Hop', 'city': 'San Francisco', 'state': 'CA', 'address': '1015 Folsom Street',
+        'phone': '123-123-1234', 'image_link': 'https://images.example.com/hop.jpg',
+        'facebook_link': 'https://www.facebook.com/TheMusicalHop',
+    })
+
+
+def test_reads_go_to_the_replicas_round_robin(replicated_app):
+    client = replicated_app.test_client()
+
+    assert [venue_names(client) for _ in range(4)] == [['replica_1'], ['replica_2']] * 2
+
+
+def test_a_client_reads_its_writes_from_the_primary(replicated_app):
+    client = replicated_app.test_client()
+
+    create_venue(client)
+
+    assert venue_names(client) == ['primary', 'The Musical Hop']
+    # other clients keep reading from the replicas
+    assert venue_names(replicated_app.test_client()) in (['replica_1'], ['replica_2'])
+
+
+def test_a_client_reading_its_writes_bypasses_the_page_cache(replicated_app):
+    writer = replicated_app.test_client()
+    create_venue(writer)
+    # another client caches /venues from a replica that lacks the new venue
+    assert 'The Musical Hop' not in replicated_app.test_client().get('/venues').get_data(as_text=True)
+
+    assert 'The Musical Hop' in writer.get('/venues').get_data(as_text=True)
+
+
+def test_autocomplete_indexes_are_read_from_the_primary(replicated_app):
+    response = replicated_app.test_client().get('/autocomplete/venues?q=p')
+
+    assert [venue['name'] for venue in response.get_json()['data']] == ['primary']
@@ -0,0 +1,40 @@
+import pytest
+
+from models import db, Venue
+from queries import search_by_name
+
+
+@pytest.fixture
+def venues(app):
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Venue(id=2, name='Park Square Live Music & Coffee'),
+                        Venue(id=3, name='The Dueling Pianos Bar')])
+    db.session.commit()
+
+
+def names(term):
+    return sorted(venue.name for venue in search_by_name(Venue, term))
+
+
+def test_search_is_a_case_insensitive_substring_match(venues):
+    assert names('Hop') == ['The Musical Hop']
+    assert names('music') == ['Park Square Live Music & Coffee', 'The Musical Hop']
+    # too short for the trigram index, served by LIKE instead
+    assert names('ho') == ['The Musical Hop']
+    assert names('%') == []
+
+
+def test_search_index_follows_renames_and_deletes(venues):
+    Venue.query.get(1).name = 'The Jazz Cellar'
+    db.session.delete(Venue.query.get(3))
+    db.session.commit()
+
+    assert names('hop') == []
+    assert names('jazz') == ['The Jazz Cellar']
+    assert names('piano') == []
+
+
+def test_search_form_lists_the_matches(venues, client):
+    html = client.post('/venues/search', data={'search_term': 'music'}).get_data(as_text=True)
+
+    assert 'The Musical Hop' in html and 'Park Square Live Music &amp; Coffee' in html
+    assert 'Dueling' not in html
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Venue, Artist, Show
+from queries import book_shows, show_occurrences
+
+START = datetime(2030, 1, 1, 20, tzinfo=timezone.utc)
+TWO_HOURS = timedelta(hours=2)
+
+
+@pytest.fixture
+def owners(app):
+    db.session.add_all([Venue(id=1, name='The Musical Hop'), Venue(id=2, name='Park Square'),
+                        Artist(id=1, name='Guns N Petals'), Artist(id=2, name='Matt Quevedo')])
+    db.session.commit()
+
+
+def test_book_shows_reports_conflicts_per_occurrence(owners):
+    # a day-long show of artist 1 at another venue, starting well before the booking
+    db.session.add(Show(venue_id=2, artist_id=1, start_time=START - timedelta(hours=20),
+                        end_time=START + timedelta(hours=4)))
+    db.session.commit()
+
+    starts = [START, START + timedelta(hours=1), START + timedelta(days=1)]
+    report = book_shows(1, 1, starts, TWO_HOURS)
+
+    assert [conflicts for _, _, conflicts in report] == [['artist'], ['artist', 'occurrence'], []]
+    assert Show.query.filter_by(venue_id=1).count() == 0
+
+
+def test_book_shows_inserts_every_occurrence(owners):
+    starts = [START + timedelta(weeks=week) for week in range(5)]
+
+    report = book_shows(1, 2, starts, TWO_HOURS)
+    db.session.commit()
+
+    assert not any(conflicts for _, _, conflicts in report)
+    assert Show.query.filter_by(venue_id=1, artist_id=2).count() == 5
+    assert Venue.query.get(1).upcoming_shows_count == 5
+
+
+def test_shows_last_at_most_a_day(owners):
+    db.session.add(Show(venue_id=1, artist_id=1, start_time=START, end_time=START + timedelta(days=1, minutes=1)))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+
+
+def test_shows_need_a_start_time(owners):
+    db.session.add(Show(venue_id=1, artist_id=1, end_time=START))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+
+
+def test_failed_listing_is_logged_not_printed(owners, client, caplog, capsys):
+    response = client.post('/shows/create', data={'venue_id': 1, 'artist_id': 99,
+                                                  'start_time': '2030-01-01 20:00'})
+
+    assert response.status_code == 200
+    assert 'listing shows failed' in caplog.text
+    assert capsys.readouterr().out == ''
+
+
+def test_bookings_and_filters_are_in_utc(owners, client):
+    assert show_occurrences('2030-01-01 22:00+02:00') == [START]
+    book_shows(1, 1, show_occurrences('2030-01-01 22:00+02:00'), TWO_HOURS)
+    db.session.commit()
+
+    # the same slot written in UTC conflicts with it
+    assert book_shows(1, 2, show_occurrences('2030-01-01 21:00'), TWO_HOURS)[0][2] == ['venue']
+    db.session.rollback()
+    assert 'Guns N Petals' in client.get('/shows?from=2030-01-01T20:30%2B01:00').get_data(as_text=True)
+    assert 'Guns N Petals' not in client.get('/shows?from=2030-01-01T20:30%2B00:00').get_data(as_text=True)
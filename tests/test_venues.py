@@ -0,0 +1,21 @@
+from benchmarks.seed import seed
+from models import db
+
+from tests.conftest import StatementCounter
+
+
+def venues_statements(app, client, venues):
+    # statements of one uncached GET /venues over a catalog of `venues` venues
+    db.drop_all()
+    db.create_all()
+    with db.engine.begin() as connection:
+        seed(connection, venues=venues, artists=venues, shows=venues * 10)
+    app.extensions['page_cache'].clear()
+    with StatementCounter(db.engine) as counter:
+        response = client.get('/venues')
+    assert response.status_code == 200
+    return counter.count
+
+
+def test_venues_query_count_does_not_grow_with_the_catalog(app, client):
+    assert venues_statements(app, client, 10) == venues_statements(app, client, 500)
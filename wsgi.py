@@ -0,0 +1,13 @@
+'''WSGI entry point for production servers.
+
+    gunicorn --preload --workers 4 wsgi:app
+
+With --preload the application is built and warmed up once in the gunicorn
+master and the workers fork from it, sharing its memory; without it every
+worker builds and warms its own copy.
+'''
+from app import create_app, preload
+
+# the `flask db` commands are not served over HTTP, so alembic stays unloaded
+app = create_app({'MIGRATE': False})
+preload(app)